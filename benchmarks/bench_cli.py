@@ -0,0 +1,48 @@
+'''
+End-to-end benchmarks of the `rvg` command, including interpreter startup.
+'''
+import os
+import subprocess as sp
+import sys
+import tempfile
+
+def rvg(*args):
+    sp.run(
+        [sys.executable, '-c', 'from rvg.cli import cli; cli()'] + list(args),
+        stdout=sp.DEVNULL,
+        check=True
+    )
+
+class CLI:
+    timeout = 300
+
+    def time_default(self):
+        rvg()
+
+    def time_scalar(self):
+        rvg('--numpy', 'int8')
+
+class CLISamples:
+    params = [['text', 'csv'], [10**3, 10**6]]
+    param_names = ['format', 'samples']
+    timeout = 300
+
+    def time_print(self, fmt, samples):
+        rvg('--numpy', 'uint32', '--limits', '0', '1000000', '--samples', str(samples), '--format', fmt)
+
+class CLIOutput:
+    params = [['npy', 'raw', 'npz'], [10**6, 10**7]]
+    param_names = ['format', 'samples']
+    timeout = 300
+
+    def setup(self, fmt, samples):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'out.' + fmt)
+
+    def teardown(self, fmt, samples):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        os.rmdir(self.tmpdir)
+
+    def time_output(self, fmt, samples):
+        rvg('--numpy', 'float32', '--samples', str(samples), '--output', self.path, '--format', fmt)
@@ -0,0 +1,205 @@
+'''
+Benchmarks of `NumPyRVG` generation, to be run with asv (https://asv.readthedocs.io):
+    asv run
+    asv continuous master HEAD
+`time_*` benchmarks report seconds per call, `track_*` ones report
+throughput, in generated elements or bytes per second.
+'''
+import timeit
+import numpy as np
+from rvg import NumPyRVG
+
+scalar_dtypes = [
+    'int8', 'int16', 'int32', 'int64',
+    'uint8', 'uint16', 'uint32', 'uint64',
+    'float16', 'float32', 'float64', 'longdouble'
+]
+
+sizes = [1, 10**2, 10**4, 10**6, 10**8]
+
+simple_struct = np.dtype([
+    ('f0', np.float32),
+    ('f1', np.int64),
+    ('f2', np.longlong)
+])
+
+simple_struct_params = {
+    'f0' : 17,
+    'f1' : 128,
+    'f2' : 42
+}
+
+nested_struct = np.dtype([
+    ('f0', simple_struct),
+    ('f1', np.uint16),
+    ('f2', simple_struct),
+    ('f3', (simple_struct, 3))
+])
+
+nested_struct_params = {
+    'f0' : (0, 42),
+    'f1' : 42,
+    'f2' : simple_struct_params,
+    'f3' : simple_struct_params
+}
+
+# the struct of the README
+knode = np.dtype([
+    ('location', int),
+    ('indices', (int, 3)),
+    ('keys', (int, 3)),
+    ('is_leaf', int),
+    ('num_keys', int)
+])
+
+knode_params = {
+    'location' : (0, 10),
+    'indices'  : 42,
+    'keys'     : 117,
+    'is_leaf'  : (0, 2),
+    'num_keys' : (0, 256)
+}
+
+def deep_struct(depth):
+    '''
+    Returns a struct nested `depth` levels deep, along with its params.
+    '''
+    dtype, params = simple_struct, simple_struct_params
+    for _ in range(depth):
+        dtype = np.dtype([('leaf', np.int32), ('inner', dtype), ('arr', (dtype, 2))])
+        params = {'leaf': 1000, 'inner': params, 'arr': params}
+    return dtype, params
+
+def throughput(func, units):
+    '''
+    Returns `units` divided by the best time of a few runs of `func`.
+    '''
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return units / (min(timer.repeat(3, number)) / number)
+
+class ScalarDtypes:
+    params = [scalar_dtypes, sizes]
+    param_names = ['dtype', 'shape']
+    timeout = 300
+
+    def setup(self, dtype, shape):
+        self.dtype = np.dtype(dtype)
+        self.rand = NumPyRVG(limits=(-100, 100), seed=0)
+
+    def time_call(self, dtype, shape):
+        self.rand(self.dtype, shape=shape)
+
+    def peakmem_call(self, dtype, shape):
+        self.rand(self.dtype, shape=shape)
+
+class ScalarThroughput:
+    params = [scalar_dtypes, [10**6]]
+    param_names = ['dtype', 'shape']
+
+    def setup(self, dtype, shape):
+        self.dtype = np.dtype(dtype)
+        self.rand = NumPyRVG(limits=(-100, 100), seed=0)
+
+    def track_elements_per_second(self, dtype, shape):
+        return throughput(lambda: self.rand(self.dtype, shape=shape), shape)
+    track_elements_per_second.unit = 'elements/s'
+
+    def track_bytes_per_second(self, dtype, shape):
+        return throughput(lambda: self.rand(self.dtype, shape=shape), shape * self.dtype.itemsize)
+    track_bytes_per_second.unit = 'bytes/s'
+
+class LegacyGlobalState:
+    params = [['int32', 'float32', 'float64'], [10**6]]
+    param_names = ['dtype', 'shape']
+
+    def setup(self, dtype, shape):
+        self.dtype = np.dtype(dtype)
+        self.rand = NumPyRVG(limits=(-100, 100))
+
+    def time_call(self, dtype, shape):
+        self.rand(self.dtype, shape=shape)
+
+class Subarrays:
+    params = [['int32', 'float64'], [(3,), (16,), (4, 4, 4)], [1, 10**2, 10**4, 10**6]]
+    param_names = ['dtype', 'sub_shape', 'shape']
+
+    def setup(self, dtype, sub_shape, shape):
+        self.dtype = np.dtype((dtype, sub_shape))
+        self.rand = NumPyRVG(limits=(-100, 100), seed=0)
+
+    def time_call(self, dtype, sub_shape, shape):
+        self.rand(self.dtype, shape=shape)
+
+    def track_elements_per_second(self, dtype, sub_shape, shape):
+        return throughput(lambda: self.rand(self.dtype, shape=shape), shape * int(np.prod(sub_shape)))
+    track_elements_per_second.unit = 'elements/s'
+
+class Structs:
+    params = [['simple', 'nested', 'deep'], [1, 10**2, 10**4, 10**6]]
+    param_names = ['struct', 'shape']
+    timeout = 300
+
+    def setup(self, struct, shape):
+        if struct == 'simple':
+            self.dtype, self.params = simple_struct, simple_struct_params
+        elif struct == 'nested':
+            self.dtype, self.params = nested_struct, nested_struct_params
+        else:
+            self.dtype, self.params = deep_struct(4)
+        self.rand = NumPyRVG(dtype=self.dtype, seed=0)
+
+    def time_call(self, struct, shape):
+        self.rand(self.params, shape)
+
+    def track_records_per_second(self, struct, shape):
+        return throughput(lambda: self.rand(self.params, shape), shape)
+    track_records_per_second.unit = 'elements/s'
+
+    def track_bytes_per_second(self, struct, shape):
+        return throughput(lambda: self.rand(self.params, shape), shape * self.dtype.itemsize)
+    track_bytes_per_second.unit = 'bytes/s'
+
+class CallOverhead:
+    '''
+    Per-call overhead of tiny generations, where the Python code dominates.
+    '''
+    def setup(self):
+        self.randsmall = NumPyRVG(limit=10, seed=0)
+        self.randnode = NumPyRVG(dtype=nested_struct, seed=0)
+
+    def time_scalar(self):
+        self.randsmall(np.uint8)
+
+    def time_scalar_array(self):
+        self.randsmall(np.float32, shape=4)
+
+    def time_struct_scalar(self):
+        self.randnode(nested_struct_params)
+
+    def time_struct_array(self):
+        self.randnode(nested_struct_params, 4)
+
+    def time_compile(self):
+        NumPyRVG(dtype=nested_struct).compile(nested_struct, nested_struct_params)
+
+    def time_compile_cached(self):
+        self.randnode.compile(nested_struct, nested_struct_params)
+
+class SmallShapes:
+    '''
+    Calls of a few values each, from a Generator and from the global state,
+    where the work per call (not per value) dominates.
+    '''
+    params = [['knode', 'nested'], [None, 1, 4, 16], [True, False]]
+    param_names = ['struct', 'shape', 'seeded']
+
+    def setup(self, struct, shape, seeded):
+        if struct == 'knode':
+            self.dtype, self.params = knode, knode_params
+        else:
+            self.dtype, self.params = nested_struct, nested_struct_params
+        self.rand = NumPyRVG(dtype=self.dtype, seed=0) if seeded else NumPyRVG(dtype=self.dtype)
+
+    def time_call(self, struct, shape, seeded):
+        self.rand(self.params, shape)
@@ -1,3 +1,16 @@
-from .numpyrvg import NumPyRVG
+import sys
+from .version import __version__
 
-__all__ = ['NumPyRVG']
+__all__ = ['NumPyRVG', '__version__']
+
+# `NumPyRVG` (and therefore numpy) is only imported when it is first accessed,
+# so that e.g. `rvg.cli` starts without paying for it until it is needed
+if sys.version_info >= (3, 7):
+    def __getattr__(name):
+        if name == 'NumPyRVG':
+            from .numpyrvg import NumPyRVG
+            globals()['NumPyRVG'] = NumPyRVG
+            return NumPyRVG
+        raise AttributeError('module ' + repr(__name__) + ' has no attribute ' + repr(name))
+else:
+    from .numpyrvg import NumPyRVG
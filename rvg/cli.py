@@ -1,64 +1,216 @@
-import argparse
 import sys
-from rvg import NumPyRVG
 
-parser = argparse.ArgumentParser(
-    description='rvg - Random Values Generator',
-    epilog='''NOTE: rvg can be run with no flags, which is equivalent to running `rvg --numpy float32 -limits 0 1`
-    (i.e. sampling of the uniform(0, 1) distribution)
+def build_parser():
+    import argparse
+    from rvg.output import formats
+
+    parser = argparse.ArgumentParser(
+        description='rvg - Random Values Generator',
+        epilog='''NOTE: rvg can be run with no flags, which is equivalent to running `rvg --numpy float32 -limits 0 1`
+        (i.e. sampling of the uniform(0, 1) distribution)
+        '''
+    )
+
+    parser.add_argument('--numpy',
+        type=str,
+        metavar='DTYPE',
+        help='request a numpy random value of type DTYPE'
+    )
+
+    parser.add_argument('-s', '--samples',
+        type=int,
+        help='number of samples to produce, one per line (default - a single value)',
+        default=None
+    )
+
+    parser.add_argument('-l', '--limits',
+        type=int,
+        nargs='+',
+        help='''if 1 positive integer is given, `limit`: define lower and upper numerical limit for produced values
+        as (-limit, limit) for signed types or (0, limit) for unsigned values\n
+        if 2 integers are given, `a` and `b`, where a < b: define lower and upper numerical limit for produced values
+        as (a, b) for signed types or (max(a, 0), b) for unsigned values, in which case b must be a positive integer
+        ''',
+        default=(0, 1)
+    )
+
+    parser.add_argument('-w', '--workers',
+        type=int,
+        help='number of threads to generate the samples with',
+        default=None
+    )
+
+    parser.add_argument('-P', '--processes',
+        action='store_true',
+        help='''generate the samples with WORKERS processes instead of threads (requires -w/--workers),
+        writing straight into .npy output files
+        '''
+    )
+
+    parser.add_argument('-S', '--seed',
+        type=int,
+        help='''generate the samples as the values of a dataset that only depends on SEED,
+        so that the same samples are produced by every run (see the `seed` argument of `NumPyRVG.random`)
+        ''',
+        default=None
+    )
+
+    parser.add_argument('-c', '--cache',
+        type=str,
+        metavar='DIR',
+        help='''store the samples generated with SEED in DIR, and load them from there
+        instead of generating them again when the same samples are requested
+        ''',
+        default=None
+    )
+
+    parser.add_argument('--stats',
+        action='store_true',
+        help='write statistics of the generation of the samples (time, bytes and draws per field) as JSON to stderr'
+    )
+
+    parser.add_argument('-o', '--output',
+        type=str,
+        metavar='FILE',
+        help='write the samples to FILE, in chunks of bounded size, instead of printing them',
+        default=None
+    )
+
+    parser.add_argument('-f', '--format',
+        choices=formats,
+        help='''format of the output (default - text, or deduced from the extension of the output FILE:
+        .npy, .npz, .txt, .csv, .jsonl, else raw); npy, npz and raw require an output FILE
+        ''',
+        default=None
+    )
+
+    parser.add_argument('-d', '--delimiter',
+        type=str,
+        help='delimiter of the fields of each sample in csv format (default - ,)',
+        default=','
+    )
+
+    parser.add_argument('-p', '--precision',
+        type=int,
+        help='number of decimal digits of floating point samples in text and csv formats (default - as printed by numpy)',
+        default=None
+    )
+
+    return parser
+
+def resolve_dtype(name):
+    '''
+    Returns the numpy dtype described by `name`, or None if there is none. `name` can be
+    anything `np.dtype` accepts as a string (e.g. `int8`, `float32`, `(3,)i4` or `i4,f8`),
+    the name of a numpy type (e.g. `double`) or a literal list of fields, e.g. `[('a', 'i4'), ('b', 'f8')]`.
+    '''
+    import numpy as np
+    try:
+        if name.lstrip().startswith('['):
+            from ast import literal_eval
+            return np.dtype(literal_eval(name))
+        return np.dtype(name)
+    except (TypeError, ValueError, SyntaxError):
+        pass
+    try:
+        return np.dtype(getattr(np, name))
+    except (AttributeError, TypeError):
+        return None
+
+def seeded_fill(rand, dtype, args):
+    '''
+    Returns a `fill` for `write_output` and `write_text` that fills the consecutive chunks of the output
+    with the consecutive rows of the dataset of `args.seed`, loaded from or stored in `args.cache`, if given.
+    '''
+    samples = 1 if args.samples is None else args.samples
+    values = None
+    if args.cache is not None:
+        # a read-only memmap of the cache entry, which a miss generates straight into, block by block
+        values = rand(dtype, samples, workers=args.workers, seed=args.seed, cache=args.cache)
+    start = 0
+
+    def fill(out):
+        nonlocal start
+        rows = out.reshape((-1,) + out.shape[out.ndim - len(dtype.shape):])
+        stop = start + len(rows)
+        if values is None:
+            rand(dtype, samples, workers=args.workers, seed=args.seed, start=start, stop=stop, out=rows)
+        else:
+            rows[...] = values[start:stop]
+        start = stop
+    return fill
+
+def write_samples(rand, dtype, args):
     '''
-)
-
-parser.add_argument('--numpy',
-    type=str,
-    metavar='DTYPE',
-    help='request a numpy random value of type DTYPE'
-)
-
-parser.add_argument('-s', '--samples',
-    type=int,
-    help='number of samples to produce, one per line (default - a single value)',
-    default=None
-)
-
-parser.add_argument('-l', '--limits',
-    type=int,
-    nargs='+',
-    help='''if 1 positive integer is given, `limit`: define lower and upper numerical limit for produced values
-    as (-limit, limit) for signed types or (0, limit) for unsigned values\n
-    if 2 integers are given, `a` and `b`, where a < b: define lower and upper numerical limit for produced values
-    as (a, b) for signed types or (max(a, 0), b) for unsigned values, in which case b must be a positive integer
-    ''',
-    default=(0, 1)
-)
+    Generates the samples of `dtype` requested by `args` with `rand`, and writes them to their output.
+    '''
+    from rvg.output import guess_format, write_output, write_text
+    fill = lambda out: rand(dtype, out=out, workers=args.workers, processes=args.processes)
+    if args.seed is not None:
+        fill = seeded_fill(rand, dtype, args)
+    if args.output is not None:
+        write_output(
+            args.output,
+            args.format or guess_format(args.output),
+            dtype,
+            args.samples,
+            fill,
+            delimiter=args.delimiter,
+            precision=args.precision
+        )
+        return
+    sys.stdout.flush()
+    write_text(
+        sys.stdout.buffer,
+        args.format or 'text',
+        dtype,
+        args.samples,
+        fill,
+        delimiter=args.delimiter,
+        precision=args.precision
+    )
 
 def cli():
 
     # default behavior
     if len(sys.argv) == 1:
         import numpy as np
+        from rvg import NumPyRVG
         rand = NumPyRVG(limits=(0, 1))
         print(rand(np.float32))
         return
 
+    from rvg.output import text_formats
+    parser = build_parser()
     args = parser.parse_args()
+    if args.format not in (None,) + text_formats and args.output is None:
+        parser.error('argument -f/--format: format ' + args.format + ' requires -o/--output')
+    if args.cache is not None and args.seed is None:
+        parser.error('argument -c/--cache: requires -S/--seed')
+    if args.processes and args.workers is None:
+        parser.error('argument -P/--processes: requires -w/--workers')
+    if args.seed is not None and args.processes:
+        parser.error('argument -P/--processes: can not be combined with -S/--seed')
     if args.numpy is None:
         sys.stderr.write('Please provide a generator flag, like --numpy <dtype>\n')
         exit(1)
 
+    from rvg import NumPyRVG
+
     if args.numpy:
-        import numpy as np
         if len(args.limits) == 1:
             rand = NumPyRVG(limit=args.limits[0])
         else:
             rand = NumPyRVG(limits=args.limits)
-        try:
-            vals = rand(eval('np.' + args.numpy), shape=args.samples)
-        except AttributeError:
+        dtype = resolve_dtype(args.numpy)
+        if dtype is None:
             sys.stderr.write('numpy does not have the type `' + args.numpy + '`\n')
             exit(1)
-        if args.samples is None:
-            print(vals)
-        else:
-            for val in vals:
-                print(val)
+        # the worker processes of -P/--processes are started once and reused for every chunk
+        with rand:
+            if args.stats:
+                with rand.profile() as stats:
+                    write_samples(rand, dtype, args)
+                sys.stderr.write(stats.to_json() + '\n')
+            else:
+                write_samples(rand, dtype, args)
@@ -0,0 +1,85 @@
+import asyncio
+from collections import deque
+from functools import partial
+import numpy as np
+
+class AsyncBatches:
+    '''
+    An asynchronous iterator over batches of random values, generated ahead of the consumer
+    (see `NumPyRVG.agenerate`). Batches are generated in order, one at a time, by a background thread,
+    so they are the same as the ones of `NumPyRVG.stream`.
+    At most `prefetch` batches are generated ahead of the one being consumed, so a slow consumer
+    holds back generation (backpressure), and if `reuse` is True, they are generated into a ring
+    of `prefetch + 1` buffers, in which case each batch is only valid until the next one is requested.
+    Closing the iterator (e.g. by `aclose`, leaving an `async with` block or cancelling the consumer)
+    cancels the batches that are not being generated yet.
+    '''
+    def __init__(self, rvg, dtype, params, batch_size, total, prefetch, reuse, kwargs):
+        self._rvg = rvg
+        self._generate = partial(rvg.random, dtype, params, **kwargs)
+        self._batch_size = batch_size
+        self._total = total
+        self._prefetch = prefetch
+        self._scheduled = 0
+        self._pending = deque()
+        self._current = None
+        self._executor = None
+        self._free = None
+        if reuse:
+            plan = rvg.compile(dtype, params)
+            rows = batch_size if total is None else min(batch_size, total)
+            self._free = deque(np.empty((rows,) + plan.shape, dtype=plan.dtype) for _ in range(prefetch + 1))
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self._current is not None:
+            self._free.append(self._current)
+            self._current = None
+        self._schedule()
+        if not self._pending:
+            await self.aclose()
+            raise StopAsyncIteration
+        future, buffer = self._pending.popleft()
+        try:
+            batch = await future
+        except BaseException:
+            await self.aclose()
+            raise
+        if buffer is not None:
+            self._current = buffer
+        # keep generating the next batches while this one is consumed
+        self._schedule()
+        return batch
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        '''
+        Stops the generation of batches, cancelling the ones that are not being generated yet.
+        '''
+        while self._pending:
+            self._pending.popleft()[0].cancel()
+        self._total = self._scheduled
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _schedule(self):
+        while len(self._pending) < self._prefetch and (self._total is None or self._scheduled < self._total):
+            if self._free is not None and not self._free:
+                return
+            size = self._batch_size if self._total is None else min(self._batch_size, self._total - self._scheduled)
+            buffer = None if self._free is None else self._free.popleft()
+            if self._executor is None:
+                from concurrent.futures import ThreadPoolExecutor
+                self._executor = ThreadPoolExecutor(1)
+            out = None if buffer is None else buffer[:size]
+            future = asyncio.get_event_loop().run_in_executor(self._executor, partial(self._generate, size, out=out))
+            self._pending.append((future, buffer))
+            self._scheduled += size
@@ -0,0 +1,126 @@
+import numpy as np
+from contextlib import contextmanager
+
+class DiskCache:
+    '''
+    A directory of generated arrays, stored as `.npy` files named after the hash of everything
+    their values depend on (see `key`), and loaded as read-only memmaps, so nothing is copied.
+    When the files take more than `max_bytes`, the least recently used ones are evicted.
+    '''
+    def __init__(self, directory, max_bytes=1 << 30):
+        if not isinstance(max_bytes, int) or max_bytes <= 0:
+            raise ValueError('argument `max_bytes` must be an integer greater than 0')
+        self.directory = str(directory)
+        self.max_bytes = max_bytes
+
+    def path(self, key):
+        import os
+        return os.path.join(self.directory, key + '.npy')
+
+    def load(self, key):
+        '''
+        Returns the array stored under `key` as a read-only memmap, or None if there is none.
+        '''
+        import os
+        path = self.path(key)
+        try:
+            arr = np.load(path, mmap_mode='r')
+        except (IOError, OSError, ValueError):
+            return None
+        # the modification time of each file is the time it was last used
+        try:
+            os.utime(path, None)
+        except OSError:
+            # e.g. a read-only cache, or a file evicted by another process after it was mapped
+            pass
+        return arr
+
+    def store(self, key, arr):
+        '''
+        Stores `arr` under `key`, then evicts the least recently used arrays until the rest fit in `max_bytes`.
+        '''
+        with self.storing(key, arr.dtype, arr.shape) as out:
+            out[...] = arr
+
+    @contextmanager
+    def storing(self, key, dtype, shape):
+        '''
+        Returns a context manager that yields a writable memmap of a new array of `dtype` and `shape`, which is
+        stored under `key` (like `store` does) when the block exits without errors, or discarded otherwise,
+        so that arrays larger than memory can be stored while they are filled.
+        '''
+        import os
+        import tempfile
+        os.makedirs(self.directory, exist_ok=True)
+        # writing to a temporary file first, so that concurrent readers never see partial files
+        fd, tmp = tempfile.mkstemp(prefix='.rvg-', suffix='.npy', dir=self.directory)
+        os.close(fd)
+        try:
+            out = np.lib.format.open_memmap(tmp, mode='w+', dtype=dtype, shape=shape)
+            yield out
+            out.flush()
+            del out
+            os.replace(tmp, self.path(key))
+        except BaseException:
+            os.remove(tmp)
+            raise
+        self.evict(keep=self.path(key))
+
+    def evict(self, keep=None):
+        import os
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.npy') and not entry.name.startswith('.'):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+def key(*args):
+    '''
+    Returns a stable hash of `args`, which may contain dtypes, arrays, numbers, strings and
+    (nested) dicts, lists and tuples of them, as well as module-level functions.
+    '''
+    import hashlib
+    h = hashlib.sha256()
+    for arg in args:
+        _update(h, arg)
+    return h.hexdigest()
+
+def _update(h, obj):
+    if isinstance(obj, dict):
+        h.update(b'{')
+        for k in sorted(obj, key=repr):
+            _update(h, k)
+            _update(h, obj[k])
+        h.update(b'}')
+    elif isinstance(obj, (list, tuple)):
+        h.update(b'(' if isinstance(obj, tuple) else b'[')
+        for item in obj:
+            _update(h, item)
+        h.update(b')')
+    elif isinstance(obj, np.dtype):
+        h.update(('dtype' + repr((obj.descr, obj.itemsize))).encode())
+    elif isinstance(obj, np.ndarray):
+        h.update(('array' + repr((obj.dtype.descr, obj.shape))).encode())
+        h.update(np.ascontiguousarray(obj).tobytes())
+    elif callable(obj) and not isinstance(obj, type):
+        name = getattr(obj, '__module__', None), getattr(obj, '__qualname__', None)
+        if None in name or '<' in name[1]:
+            raise ValueError('values generated with the callable ' + repr(obj) + ' can not be cached; '
+                             'use a module-level function or a registered name instead')
+        h.update(('callable' + '.'.join(name)).encode())
+    else:
+        h.update((type(obj).__name__ + repr(obj)).encode())
@@ -0,0 +1,88 @@
+from collections import OrderedDict
+import numpy as np
+
+layouts = ('struct', 'columnar')
+
+class Columns(OrderedDict):
+    '''
+    Values generated in the columnar layout: a contiguous array per scalar field, named after its
+    dotted path (or `value` for non-struct dtypes), of shape `shape` + the subarray shape of the field.
+    The columns can be exposed as an Arrow table or a pandas DataFrame without copying their values.
+    '''
+    def __init__(self, shape):
+        super().__init__()
+        self.shape = shape
+
+    def rows(self):
+        '''
+        Yields (name, column) pairs, with the leading dimensions of each column flattened into rows.
+        '''
+        rows = int(np.prod(self.shape))
+        for name, column in self.items():
+            yield name, column.reshape((rows,) + column.shape[len(self.shape):])
+
+    def to_record_batch(self):
+        '''
+        Returns the columns as a `pyarrow.RecordBatch`. Subarray fields become (nested) fixed-size list
+        columns and complex fields fixed-size lists of their (real, imaginary) parts.
+        Numbers and dates are shared with Arrow, bools and strings are converted.
+        '''
+        pa = optional_import('pyarrow')
+        names, arrays = [], []
+        for name, column in self.rows():
+            names.append(name)
+            arrays.append(arrow_array(pa, column))
+        return pa.RecordBatch.from_arrays(arrays, names=names)
+
+    def to_arrow(self):
+        '''
+        Returns the columns as a `pyarrow.Table` (see `to_record_batch`).
+        '''
+        pa = optional_import('pyarrow')
+        return pa.Table.from_batches([self.to_record_batch()])
+
+    def to_pandas(self):
+        '''
+        Returns the columns as a `pandas.DataFrame`, without copying them.
+        Each item of a subarray field becomes a column of its own, e.g. `keys[0]`, `keys[1]`, ...
+        '''
+        pd = optional_import('pandas')
+        data = OrderedDict()
+        for name, column in self.rows():
+            for index in np.ndindex(*column.shape[1:]):
+                data[name + ''.join('[' + str(i) + ']' for i in index)] = column[(slice(None),) + index]
+        return pd.DataFrame(data, copy=False)
+
+def column_leaf(leaf, shape):
+    '''
+    Returns a new contiguous column for the values of `leaf` in an output of `shape`, along with
+    the base array of the column (its first subarray item of each row, None if the column is empty)
+    and a leaf that fills the column through that base, the way `leaf` fills a struct array.
+    '''
+    column = np.empty(shape + leaf.shape, dtype=leaf.dtype)
+    strides = tuple(int(np.prod(leaf.shape[i + 1:])) * leaf.dtype.itemsize for i in range(len(leaf.shape)))
+    base = column[(Ellipsis,) + (0,) * len(leaf.shape)] if column.size else None
+    return column, base, leaf._replace(offset=0, strides=strides)
+
+def arrow_array(pa, column):
+    '''
+    Returns the 1-dimensional Arrow array of the rows of `column`.
+    '''
+    if not column.dtype.isnative:
+        column = column.astype(column.dtype.newbyteorder('='))
+    shape = column.shape[1:]
+    if column.dtype.kind == 'c':
+        column = column.view(np.dtype('f' + str(column.dtype.itemsize // 2))).reshape(column.shape + (2,))
+        shape += (2,)
+    arr = pa.array(column.reshape(-1))
+    for size in reversed(shape):
+        arr = pa.FixedSizeListArray.from_arrays(arr, size)
+    return arr
+
+def optional_import(name, package=None):
+    import importlib
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        package = package or name
+        raise ImportError(package + ' is required for this conversion, install it with `pip install ' + package + '`')
@@ -0,0 +1,92 @@
+from collections import namedtuple
+import numpy as np
+
+class Derived(namedtuple('Derived', ['name', 'dtype', 'derive', 'depends'])):
+    '''
+    A field whose values are computed from the values of other fields, instead of drawn.
+        name:    dotted path of the field
+        dtype:   the dtype of the field (possibly a struct or a subarray)
+        derive:  a vectorized callable, called with the generated values, or an expression
+                 of the (top-level) field names, e.g. 'start + duration'
+        depends: the (dotted) names of the fields that `derive` uses
+    '''
+    __slots__ = ()
+
+def derived_field(name, dtype, params):
+    '''
+    Returns the `Derived` field `name` of `dtype`, as described by its `params`.
+    The fields an expression depends on are found in it; those of a callable can be given as 'depends'.
+    '''
+    derive = params['derive']
+    if isinstance(derive, str):
+        depends = names(derive)
+    elif callable(derive):
+        depends = tuple(params.get('depends', ()))
+    else:
+        raise TypeError('the `derive` param of field `' + name + '` must be a callable or an expression')
+    return Derived(name, dtype, derive, depends)
+
+def names(expression):
+    '''
+    Returns the names used by `expression`.
+    '''
+    import ast
+    return tuple(sorted(set(
+        node.id for node in ast.walk(ast.parse(expression, mode='eval')) if isinstance(node, ast.Name)
+    ) - {'np'}))
+
+def evaluate(derive, values):
+    '''
+    Returns the result of the callable or expression `derive` for the generated `values`
+    (a struct array or a dict of columns). Expressions can use the top-level fields by name, and `np`.
+    '''
+    if callable(derive):
+        return derive(values)
+    return eval(derive, {'np': np, '__builtins__': {}}, Fields(values))
+
+class Fields:
+    '''
+    The top-level fields of `values` as a namespace for expressions.
+    '''
+    def __init__(self, values):
+        self.values = values
+
+    def __getitem__(self, name):
+        try:
+            return self.values[name]
+        except (KeyError, ValueError):
+            raise KeyError(name)
+
+def order(derived):
+    '''
+    Returns the `derived` fields in an order in which each one comes after the derived fields it depends on.
+    '''
+    def depends(a, b):
+        return any(name == b.name or b.name.startswith(name + '.') or name.startswith(b.name + '.') for name in a.depends)
+
+    ordered, pending = [], list(derived)
+    while pending:
+        ready = [a for a in pending if not any(depends(a, b) for b in pending if b is not a)]
+        if not ready:
+            raise ValueError('derived fields ' + ', '.join(a.name for a in pending) + ' depend on each other')
+        ordered += ready
+        pending = [a for a in pending if all(a is not b for b in ready)]
+    return ordered
+
+def field(values, name):
+    '''
+    Returns a view of the field with the dotted path `name` inside the struct array `values`.
+    '''
+    for part in name.split('.'):
+        values = values[part]
+    return values
+
+def predicate(constraint):
+    '''
+    Returns the callable of `constraint`, a vectorized callable or an expression (see `evaluate`).
+    '''
+    if callable(constraint):
+        return constraint
+    if isinstance(constraint, str):
+        return lambda values: evaluate(constraint, values)
+    raise TypeError('each constraint must be a callable or an expression')
@@ -0,0 +1,151 @@
+from collections import namedtuple
+import math
+import numpy as np
+from .utils import clip_limits, split_limits, uniform_dist
+
+distributions = {}
+
+def register(name, elementwise=True):
+    '''
+    Registers the decorated function as the distribution `name`, usable as the `dist`
+    argument of `NumPyRVG` or as the 'dist' key of the params of any field.
+    A distribution is called as `dist(dtype, params, shape, type_limits, rng=None, **options)`,
+    where `params` are the limits of the values, and `options` the rest of the keys of the field's params.
+    '''
+    def decorator(dist):
+        dist.elementwise = elementwise
+        distributions[name] = dist
+        return dist
+    return decorator
+
+register('uniform')(uniform_dist)
+
+def get_dist(dist):
+    '''
+    Returns the distribution `dist`, which is either a callable or the name of a registered one.
+    '''
+    if dist is None or callable(dist):
+        return dist
+    try:
+        return distributions[dist]
+    except (KeyError, TypeError):
+        raise ValueError('unknown distribution `' + str(dist) + '`, expected one of ' + ', '.join(sorted(distributions)))
+
+@register('normal')
+def normal_dist(dtype, params, shape, type_limits, rng=None, loc=0., scale=1.):
+    vals = standard(rng, 'standard_normal', dtype, shape)
+    vals *= scale
+    vals += loc
+    return bounded(vals, dtype, params, type_limits)
+
+@register('lognormal')
+def lognormal_dist(dtype, params, shape, type_limits, rng=None, mean=0., sigma=1.):
+    vals = standard(rng, 'standard_normal', dtype, shape)
+    vals *= sigma
+    vals += mean
+    np.exp(vals, out=vals)
+    return bounded(vals, dtype, params, type_limits)
+
+@register('exponential')
+def exponential_dist(dtype, params, shape, type_limits, rng=None, scale=1.):
+    vals = standard(rng, 'standard_exponential', dtype, shape)
+    vals *= scale
+    return bounded(vals, dtype, params, type_limits)
+
+@register('truncnorm')
+def truncnorm_dist(dtype, params, shape, type_limits, rng=None, loc=0., scale=1., max_tries=100):
+    '''
+    The normal distribution truncated to the limits of the values: values out of them are
+    drawn again (all of them at once), instead of being clipped to them.
+    '''
+    low, high = bounds(dtype, params, type_limits)
+    vals = normal_dist(np.dtype(np.float64), None, shape, False, rng, loc, scale)
+    bad = np.asarray((vals < low) | (vals > high))
+    for _ in range(max_tries):
+        if not bad.any():
+            return bounded(vals, dtype, params, type_limits)
+        vals[bad] = normal_dist(np.dtype(np.float64), None, int(bad.sum()), False, rng, loc, scale)
+        bad = np.asarray((vals < low) | (vals > high))
+    raise ValueError('could not draw values of the truncated normal distribution within the limits after '
+                     + str(max_tries) + ' tries')
+
+@register('poisson')
+def poisson_dist(dtype, params, shape, type_limits, rng=None, lam=1.):
+    vals = (np.random if rng is None else rng).poisson(lam, shape)
+    return bounded(np.asarray(vals), dtype, params, type_limits)
+
+@register('zipf')
+def zipf_dist(dtype, params, shape, type_limits, rng=None, a=2.):
+    vals = (np.random if rng is None else rng).zipf(a, shape)
+    return bounded(np.asarray(vals), dtype, params, type_limits)
+
+def standard(rng, method, dtype, shape):
+    '''
+    Returns an array of `shape` values drawn by the `method` of `rng` (e.g. 'standard_normal'),
+    in float32 precision for floats of up to 32 bits when `rng` is a Generator, else in float64.
+    '''
+    if rng is None:
+        return np.asarray(getattr(np.random, method)(shape), dtype=np.float64)
+    sample_dtype = np.float32 if dtype.kind == 'f' and dtype.itemsize <= 4 else np.float64
+    return np.asarray(getattr(rng, method)(shape, dtype=sample_dtype), dtype=sample_dtype)
+
+def bounds(dtype, params, type_limits):
+    '''
+    Returns the (low, high) bounds that values of `dtype` are clipped to, inclusive, for the limits
+    described by `params`, which are None for no limits, `limit` or `(low, high)` (see `split_limits`).
+    Like the ones of `uniform_dist`, the limits of integers are half-open, [low, high), and they are
+    always limited to the range of their type, while the ones of floats are only if `type_limits` is True.
+    '''
+    low, high = (-np.inf, np.inf) if params is None else split_limits(params)
+    if np.ndim(low) or np.ndim(high):
+        low, high = np.asarray(low, dtype=np.float64), np.asarray(high, dtype=np.float64)
+        if dtype.kind in 'iu':
+            return clip_limits(np.ceil(low), np.ceil(high) - 1, np.iinfo(dtype))
+        return clip_limits(low, high, np.finfo(dtype)) if type_limits else (low, high)
+    if dtype.kind in 'iu':
+        info = np.iinfo(dtype)
+        low = int(info.min) if low <= info.min else math.ceil(low)
+        high = int(info.max) if high > info.max else math.ceil(high) - 1
+        return low, high
+    if type_limits:
+        low, high = clip_limits(low, high, np.finfo(dtype))
+    return float(low), float(high)
+
+def representable(dtype):
+    '''
+    Returns the range of the integer type `dtype`, narrowed to floats that can be cast to it.
+    '''
+    info = np.iinfo(dtype)
+    low, high = float(info.min), float(info.max)
+    return Range(
+        low if low >= info.min else float(np.nextafter(low, np.inf)),
+        high if high <= info.max else float(np.nextafter(high, -np.inf))
+    )
+
+Range = namedtuple('Range', ['min', 'max'])
+
+def bounded(vals, dtype, params, type_limits):
+    '''
+    Clips `vals` in place to the limits described by `params` (rounding them first,
+    if `dtype` is an integer type) and returns them as values of `dtype`.
+    '''
+    low, high = bounds(dtype, params, type_limits)
+    if dtype.kind in 'iu' and vals.dtype.kind == 'f':
+        np.rint(vals, out=vals)
+        if np.ndim(low) or np.ndim(high):
+            # only the limits of the type itself may not be exactly representable
+            low, high = clip_limits(low, high, representable(dtype))
+        else:
+            # bounds that are not exactly representable must not be rounded outwards
+            low = float(low) if float(low) >= low else float(np.nextafter(float(low), np.inf))
+            high = float(high) if float(high) <= high else float(np.nextafter(float(high), -np.inf))
+    elif dtype.kind in 'iu':
+        if np.ndim(low) or np.ndim(high):
+            # array bounds are floats, which must be cast to the integer values to clip them
+            low, high = (limit.astype(vals.dtype) for limit in clip_limits(low, high, representable(vals.dtype)))
+        else:
+            low, high = clip_limits(low, high, np.iinfo(vals.dtype))
+    elif vals.dtype.kind != 'f':
+        vals = vals.astype(dtype)
+    np.clip(vals, low, high, out=vals)
+    return vals.astype(dtype, copy=False)
@@ -0,0 +1,156 @@
+import numpy as np
+from .utils import int_limits, randint, split_limits, uniform_dist
+
+# the generation modes, usable as arguments of `NumPyRVG` or as keys of the params of any field
+mode_names = ('unique', 'sorted', 'permutation')
+
+def sample_modes(dist, sample, leaf, shape, type_limits, rng, modes, max_tries=100):
+    '''
+    Draws the values of `leaf` for an output of `shape` with the generation `modes`:
+        unique:      no value appears twice
+        sorted:      the values are in ascending order
+        permutation: the values are a random permutation of consecutive integers,
+                     starting from the lower limit
+    The modes of subarray fields apply to the items of each subarray,
+    the modes of all other fields to the whole output.
+    '''
+    if leaf.params is not None and any(np.ndim(limit) for limit in split_limits(leaf.params)):
+        raise ValueError('generation modes require scalar limits, not arrays')
+    if leaf.shape:
+        rows, size = int(np.prod(shape)), int(np.prod(leaf.shape))
+    else:
+        rows, size = 1, int(np.prod(shape))
+
+    def draw(draw_shape):
+        vals = sample(leaf.dtype, leaf.params, draw_shape, type_limits, rng, None, **leaf.options)
+        return np.asarray(vals, dtype=leaf.dtype).reshape(draw_shape)
+
+    if 'permutation' in modes or ('unique' in modes and dist is uniform_dist and leaf.dtype.kind in 'iu'):
+        if leaf.dtype.kind not in 'iu':
+            raise TypeError('generation mode `permutation` requires an integer type, not ' + str(leaf.dtype))
+        low, high = (int(limit) for limit in int_limits(leaf.dtype, leaf.params, type_limits))
+        span = size if 'permutation' in modes else high - low
+        if size > high - low:
+            raise ValueError('can not draw ' + str(size) + ' distinct values of ' + str(leaf.dtype)
+                             + ' from the limits [' + str(low) + ', ' + str(high) + ')')
+        if leaf.shape:
+            offsets = floyd_rows(rng, rows, size, span)
+            if 'sorted' not in modes:
+                offsets = shuffle_rows(rng, offsets)
+        else:
+            offsets = unique_ints(rng, size, span).reshape(1, size)
+        vals = shift(offsets, low, leaf.dtype)
+    elif 'unique' in modes:
+        if leaf.shape:
+            vals = unique_rows(draw, rows, size, max_tries)
+        else:
+            vals = unique_values(draw, size, max_tries).reshape(1, size)
+    else:
+        vals = draw((rows, size))
+
+    if 'sorted' in modes:
+        vals.sort(axis=1)
+    return vals.reshape(shape + leaf.shape)
+
+def unique_ints(rng, n, span):
+    '''
+    Returns `n` distinct integers of [0, span) in random order, as uint64.
+    Dense requests are served by a random permutation of the whole range, sparse ones by
+    a Feistel network, so no memory (or hash set) proportional to `span` is ever needed.
+    '''
+    if span <= 4 * n:
+        return (np.random if rng is None else rng).permutation(span)[:n].astype(np.uint64)
+    return feistel(rng, n, span)
+
+def feistel(rng, n, span, rounds=4, block=1 << 20):
+    '''
+    Returns the images of 0, ..., n - 1 under a random bijection of [0, span), as uint64.
+    The bijection is a balanced Feistel network over the smallest domain of an even number of bits
+    that covers [0, span) (at most 4 times larger), restricted to [0, span) by cycle walking.
+    '''
+    half = max(1, ((span - 1).bit_length() + 1) // 2)
+    shift_bits, mask = np.uint64(half), np.uint64((1 << half) - 1)
+    keys = randint(rng, 0, 1 << 32, rounds, np.dtype(np.uint32)).astype(np.uint64)
+
+    def encrypt(x):
+        left, right = x >> shift_bits, x & mask
+        for key in keys:
+            left, right = right, left ^ (mix(right ^ key) & mask)
+        return (left << shift_bits) | right
+
+    out = np.empty(n, dtype=np.uint64)
+    for start in range(0, n, block):
+        x = encrypt(np.arange(start, min(n, start + block), dtype=np.uint64))
+        if span < 1 << (2 * half):
+            limit = np.uint64(span)
+            walk = np.flatnonzero(x >= limit)
+            while walk.size:
+                x[walk] = encrypt(x[walk])
+                walk = walk[x[walk] >= limit]
+        out[start:start + len(x)] = x
+    return out
+
+def mix(x):
+    # the finalizer of splitmix64
+    x = x * np.uint64(0x9E3779B97F4A7C15)
+    x ^= x >> np.uint64(32)
+    x *= np.uint64(0xBF58476D1CE4E5B9)
+    x ^= x >> np.uint64(29)
+    return x
+
+def floyd_rows(rng, rows, k, span):
+    '''
+    Returns `rows` rows of `k` distinct integers of [0, span) each, as uint64, by Floyd's sampling
+    algorithm run on all rows at once. The integers of each row are not in random order.
+    '''
+    sel = np.empty((rows, k), dtype=np.uint64)
+    for i, j in enumerate(range(span - k, span)):
+        t = np.asarray(randint(rng, 0, j + 1, rows, np.dtype(np.uint64)))
+        t[(sel[:, :i] == t[:, np.newaxis]).any(axis=1)] = j
+        sel[:, i] = t
+    return sel
+
+def shuffle_rows(rng, vals):
+    '''
+    Returns `vals` with the items of each row in random order.
+    '''
+    keys = (np.random if rng is None else rng).random(vals.shape)
+    return np.take_along_axis(vals, np.argsort(keys, axis=1), axis=1)
+
+def shift(offsets, low, dtype):
+    '''
+    Returns `low + offsets` (where `offsets` are uint64) as values of `dtype`.
+    '''
+    vals = offsets + np.uint64(low % (1 << 64))
+    if dtype.kind == 'i':
+        vals = vals.view(np.int64)
+    return vals.astype(dtype)
+
+def unique_values(draw, n, max_tries):
+    '''
+    Returns `n` distinct values drawn by `draw(shape)`, in the order they were drawn,
+    drawing again as many values as there were duplicates, until there are none.
+    '''
+    vals = draw((n,))
+    for _ in range(max_tries):
+        _, first = np.unique(vals, return_index=True)
+        if len(first) == n:
+            return vals
+        vals = np.concatenate((vals[np.sort(first)], draw((n - len(first),))))
+    raise ValueError('could not draw ' + str(n) + ' distinct values after ' + str(max_tries) + ' tries')
+
+def unique_rows(draw, rows, k, max_tries):
+    '''
+    Returns `rows` rows of `k` distinct values drawn by `draw(shape)` each,
+    drawing the rows that contain duplicates again, until there are none.
+    '''
+    vals = draw((rows, k))
+    bad = np.arange(rows)
+    for _ in range(max_tries):
+        ordered = np.sort(vals[bad], axis=1)
+        bad = bad[(ordered[:, 1:] == ordered[:, :-1]).any(axis=1)]
+        if not bad.size:
+            return vals
+        vals[bad] = draw((bad.size, k))
+    raise ValueError('could not draw ' + str(rows) + ' rows of ' + str(k) + ' distinct values after '
+                     + str(max_tries) + ' tries')
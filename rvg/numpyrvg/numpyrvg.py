@@ -1,6 +1,15 @@
+from collections import OrderedDict
+import numbers
 import numpy as np
-from numpy.lib.recfunctions import _get_fieldspec as fields
-from .utils import isscalar, issubarray, isstruct, to_tuple, maybe_dict_get, uniform_dist
+from ..version import __version__
+from .cache import DiskCache, key as cache_key
+from .columnar import Columns, column_leaf, layouts
+from .derive import evaluate, field, predicate
+from .dists import get_dist
+from .modes import mode_names, sample_modes
+from .plan import Plan, freeze, thaw
+from .sparse import sample_positions, sparse_formats, sparse_output
+from .utils import dist_caller, make_rng, randint, to_tuple, uniform_dist
 import warnings
 
 class NumPyRVG:
@@ -9,7 +18,15 @@ class NumPyRVG:
     Generates random scalars (if `samples` is not given) or arrays of a certain type.
     The type can be either a primitive one, a scalar or a struct.
     '''
-    def __init__(self, **kwargs):
+    plan_cache_size = 128
+    chunk_size = 1 << 16
+    constraint_tries = 100
+    block_size = 1 << 12
+    pool_size = 1 << 16
+    _stats = None
+    _executor = None
+
+    def __init__(self, *, seed=None, rng=None, bit_generator=None, pool=None, **kwargs):
         '''
         kwargs can contain exactly one of the following:
             dtype:  A dtype for the generated values
@@ -17,6 +34,18 @@ class NumPyRVG:
                     numerical limits of the generated values (-limit, limit)
             limits: An iterable with two integers, a and b,
                     that will be used as the numerical limits of the generated values (a, b)
+
+        Optionally, the random engine of the generator can be defined with:
+            seed:          A seed for a new `numpy.random.Generator` owned by this instance
+            rng:           An existing `numpy.random.Generator` to draw all values from
+            bit_generator: The name (or class) of the bit generator of the new `numpy.random.Generator`,
+                           one of 'PCG64' (default), 'PCG64DXSM', 'Philox', 'SFC64' or 'MT19937'
+        If none of them is given, values are drawn from the global (legacy) `numpy.random` state.
+
+        If `pool` is True (or the number of values of each pool, default `pool_size`), scalars requested
+        by calls without a `shape` are handed out from a pool per (dtype, params), which is refilled
+        with a whole array of values at once when it runs out. The values follow the same distribution,
+        at a fraction of the cost per call, but they are drawn in a different order than without pools.
         '''
 
         kwargs_error_msg = 'exactly one of the following arguments is needed: `dtype`, `limit`, `limits`'
@@ -47,10 +76,11 @@ class NumPyRVG:
                 a, b = limits
             except (TypeError, ValueError) as e:
                 raise type(e)('argument `limits` must be an iterable with exactly 2 integers')
-            if a >= b:
+            if np.any(np.asarray(a) >= np.asarray(b)) if np.ndim(a) or np.ndim(b) else a >= b:
                 raise ValueError('the lower limit must be strictly less than the upper limit')
             self.a, self.b = a, b
-            if b < 0 and dtype is None:
+            # limits may also be dates or durations, which are never unsigned
+            if isinstance(b, numbers.Real) and b < 0 and dtype is None:
                 warnings.warn(
                     'value ' + str(b) + ' as the upper limit will cause a runtime error if generation of values of unsigned type is attempted',
                     Warning,
@@ -58,43 +88,662 @@ class NumPyRVG:
                 )
 
         self.dtype = dtype
+        self.rng = make_rng(seed, rng, bit_generator)
+        self._plans = OrderedDict()
+        self._plans_by_id = OrderedDict()
+        self._scalars = {}
 
-    def __call__(self, arg=None, shape=None, dist=None, type_limits=True):
+        if pool is None or pool is False:
+            self._pools = None
+        elif pool is True or (isinstance(pool, int) and pool > 0):
+            self._pools, self._pool_size = {}, self.pool_size if pool is True else pool
+        else:
+            raise ValueError('argument `pool` must be a boolean or an integer greater than 0')
+
+    def __call__(self, arg=None, shape=None, dist=None, type_limits=True, **kwargs):
+        if shape is None and dist is None and not kwargs:
+            if self._pools is not None:
+                value = self._pooled(arg, type_limits)
+                if value is not None:
+                    return value
+            scalar = self._scalar(arg, type_limits)
+            if scalar is not None:
+                return draw_scalar(scalar, self.rng)
         if self.dtype is not None:
             if arg is None:
                 raise TypeError('missing 1 required argument describing the limit(s)')
-            return self.random(self.dtype, arg, shape, dist, type_limits)
+            return self.random(self.dtype, arg, shape, dist, type_limits, **kwargs)
         elif self.a is not None:
             if arg is None:
                 raise TypeError('missing 1 required argument describing the dtype')
-            return self.random(arg, (self.a, self.b), shape, dist, type_limits)
+            return self.random(arg, self._limits(), shape, dist, type_limits, **kwargs)
         raise NotImplementedError('this call can not be served')
 
-    def random(self, dtype, params, shape=None, dist=None, type_limits=True):
-        dist = dist or uniform_dist
-        dtype = np.dtype(dtype)
-
-        def gen(dtype, params, shape):
-            if isstruct(dtype):
-                r = np.empty(shape or 1, dtype=dtype)
-                for field_name, field_dtype in fields(dtype):
-                    field_params = maybe_dict_get(params, field_name)
-                    # there may be tuples as names, e.g. ('x', 's0')
-                    try:
-                        r[field_name] = gen(field_dtype, field_params, shape)
-                    except IndexError:
-                        r[field_name[0]] = gen(field_dtype, field_params, shape)
-                return r if shape else r[0]
-            elif issubarray(dtype):
-                item_dtype, sub_shape = dtype.subdtype
-                field_shape = to_tuple(shape) + sub_shape
-                return gen(item_dtype, params, field_shape)
-            elif isscalar(dtype):
-                try:
-                    return dtype.type(dist(dtype, params, shape, type_limits))
-                except TypeError:
-                    return dtype.type(dist(dtype, params, shape))
-            else:
-                raise NotImplementedError(dtype)
-
-        return gen(dtype, params, shape)
+    def _pooled(self, arg, type_limits):
+        '''
+        Returns the next scalar of the pool of (`arg`, its params, `type_limits`), refilling it when it runs out,
+        or None if `arg` can not be pooled.
+        '''
+        # the limits of the instance are part of the key, so that pools never outlive them
+        if self.dtype is None:
+            self._limits()
+            key = (arg, self._limits_key, type_limits)
+        else:
+            key = (None, freeze(arg), type_limits)
+        if arg is None or key[1] is None:
+            return None
+        try:
+            return next(self._pools[key])
+        except (KeyError, StopIteration):
+            pass
+        except TypeError:
+            # unhashable dtype descriptions are not pooled
+            return None
+        pool = self._pools[key] = iter(self(arg, self._pool_size, type_limits=type_limits))
+        return next(pool)
+
+    def _limits(self):
+        # the same (a, b) tuple is passed to every call, so that its plan is found by identity (see `compile`),
+        # and it is frozen once, for the keys of the pools
+        limits = self.__dict__.get('_limits_tuple')
+        if limits is None or limits[0] is not self.a or limits[1] is not self.b:
+            limits = self._limits_tuple = (self.a, self.b)
+            self._limits_key = freeze(limits)
+        return limits
+
+    def _scalar(self, arg, type_limits):
+        '''
+        Returns the (dtype, sampler) of the scalars of `arg` that are values of a single plain field
+        (e.g. the values of `NumPyRVG(limit=10)(np.uint8)`), or None if they are not.
+        They are resolved once per (dtype, params, type_limits), into a table that calls without
+        a `shape` dispatch through, skipping all the work of `random` that they do not need.
+        '''
+        if arg is None or self._stats is not None:
+            return None
+        if self.dtype is not None:
+            dtype, params = self.dtype, arg
+        else:
+            dtype, params = arg, self._limits()
+        try:
+            key = (dtype, params, type_limits)
+            return self._scalars[key]
+        except KeyError:
+            pass
+        except TypeError:
+            # unhashable dtypes or params are not dispatched
+            return None
+        plan = self.compile(dtype, params)
+        scalar = None
+        if len(plan.leaves) == 1 and not plan.derived and not plan.shape:
+            leaf = plan.leaves[0]
+            if not leaf.shape and not leaf.modes and leaf.dtype == plan.dtype:
+                scalar = (plan.dtype, leaf.sampler(uniform_dist, type_limits))
+        if len(self._scalars) >= self.plan_cache_size:
+            self._scalars.clear()
+        self._scalars[key] = scalar
+        return scalar
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        '''
+        Shuts down the worker processes started by generations with `processes`, if any.
+        They are otherwise kept alive and reused by the next such generations.
+        '''
+        if self._executor is not None:
+            self._executor[1].shutdown()
+            self._executor = None
+
+    def _process_pool(self, workers):
+        if self._executor is None or self._executor[0] != workers:
+            self.close()
+            from concurrent.futures import ProcessPoolExecutor
+            self._executor = (workers, ProcessPoolExecutor(workers))
+        return self._executor[1]
+
+    def compile(self, dtype, params):
+        '''
+        Flattens `dtype` and `params` into a `Plan` of leaf operations.
+        Plans are cached per (dtype, params), evicting the least recently used
+        one when more than `plan_cache_size` plans have been compiled.
+        The plan of the very same `params` object (and `dtype`) is found again by its identity,
+        without walking `params`, as long as they still equal a copy of them taken when it was compiled.
+        '''
+        try:
+            known = self._plans_by_id.get((dtype, id(params)))
+        except TypeError:
+            known = None
+        if known is not None and known[0] is params and known[1] == params:
+            return known[2]
+        key = freeze(params)
+        if key is None:
+            return Plan(dtype, params)
+        key = (np.dtype(dtype), key)
+        plan = self._plans.get(key)
+        if plan is None:
+            plan = self._plans[key] = Plan(dtype, params)
+            if len(self._plans) > self.plan_cache_size:
+                self._plans.popitem(last=False)
+        else:
+            self._plans.move_to_end(key)
+        try:
+            self._plans_by_id[dtype, id(params)] = (params, thaw(key[1]), plan)
+        except TypeError:
+            return plan
+        if len(self._plans_by_id) > self.plan_cache_size:
+            self._plans_by_id.popitem(last=False)
+        return plan
+
+    def random(self, dtype, params, shape=None, dist=None, type_limits=True, workers=None, out=None,
+               unique=False, sorted=False, permutation=False, layout='struct', constraints=None, processes=False,
+               seed=None, start=None, stop=None, cache=None, density=None, sparse_format='coo'):
+        '''
+        Generates a random value (if `shape` is None) or array of `dtype`,
+        with `params` describing the limits of each of its fields.
+            dist:        The distribution to draw the values from (default `uniform_dist`)
+            type_limits: Whether to clip the limits to the ones of each field's type
+            workers:     If given, the output is split into chunks of `chunk_size` rows,
+                         each drawn from its own spawned stream by a pool of `workers` threads;
+                         the result only depends on the state of the generator, not on `workers`
+            processes:   Whether the `workers` are processes instead of threads; they write their chunks
+                         straight into `out`, if it is a (C-contiguous) `numpy.memmap`, else into a memmap
+                         of a temporary file, which is returned (or copied into `out`); the values
+                         are the same as the ones generated by threads
+            out:         An existing array (e.g. a struct field view or a memmap) of `dtype`
+                         to write the values into, instead of allocating a new one; it is returned
+            unique:      Whether the values of each field must be distinct
+            sorted:      Whether the values of each field must be in ascending order
+            permutation: Whether the values of each (integer) field must be a random permutation
+                         of consecutive integers, starting from the lower limit
+            layout:      'struct' (default) for an array of `dtype`, or 'columnar' for a `Columns` dict
+                         of a contiguous array per scalar field, generated one after the other,
+                         which can be exposed as an Arrow table or a pandas DataFrame without copying
+            constraints: A predicate (or a list of them) that every generated value must satisfy,
+                         either a vectorized callable or an expression of the field names (e.g. 'end > start');
+                         the values that violate them are drawn again, until none does
+            seed:        If given, `shape` describes a virtual dataset whose values only depend on `seed`,
+                         and only its rows `start` (default 0) to `stop` (default all) are generated;
+                         the rows are drawn in blocks of `block_size`, with each field of each block drawn
+                         from a counter-based Philox stream at counter (0, 0, field, block), so any range
+                         of rows is the same as in the whole dataset, regardless of `workers`
+            cache:       A directory (or a `DiskCache`) to store the values generated with a `seed` in, as a
+                         `.npy` file named after the hash of everything they depend on (including the versions
+                         of rvg and numpy); unless they are written into `out`, they are generated straight into
+                         that file and returned as a read-only memmap of it, and when the same values are requested
+                         again, they are loaded from it instead of being generated
+            density:     If given, only a fraction `density` of the values (on average) of the array of `shape`
+                         is drawn, at positions sampled without replacement, and the rest are zeros;
+                         the cost scales with the number of nonzeros, not with the size of the array;
+                         numbers drawn at those positions are never 0 (zeros are drawn again), while
+                         for other dtypes (e.g. structs) `density` is the fraction of drawn values
+            sparse_format: The form of the output with a `density`: 'coo' (default) or 'csr' for a
+                         `scipy.sparse` matrix (of a 2-dimensional `shape`), or 'indices' for a tuple of
+                         the index arrays of the nonzeros (as returned by `numpy.nonzero`) and their values
+        The modes `unique`, `sorted` and `permutation` can also be enabled per field, as keys of its params.
+        They apply to the items of each subarray of subarray fields, and to the whole output for all other fields.
+        A field whose params contain 'derive' (a vectorized callable of the generated values, or an expression
+        of the field names) is computed from the other fields after they are drawn, instead of being drawn.
+        '''
+        if layout not in layouts:
+            raise ValueError('unknown layout `' + str(layout) + '`, expected one of ' + ', '.join(layouts))
+        stats = self._stats
+        mark = None if stats is None else stats.timer()
+        dist_arg, dist = dist, get_dist(dist) or uniform_dist
+        modes = frozenset(mode for mode, enabled in zip(mode_names, (unique, sorted, permutation)) if enabled)
+        plan = self.compile(dtype, params)
+        if mark is not None:
+            mark('compile')
+        if seed is not None:
+            if layout != 'struct' or constraints is not None or processes or density is not None:
+                raise ValueError('argument `seed` can not be combined with `layout`, `constraints`, `processes` '
+                                 'or `density`')
+            return self._seeded(plan, params, shape, seed, start, stop, cache, out, dist_arg, dist, type_limits,
+                                workers, modes, mark)
+        if start is not None or stop is not None:
+            raise ValueError('arguments `start` and `stop` require a `seed`')
+        if cache is not None:
+            raise ValueError('argument `cache` requires a `seed`')
+        # drawing same-typed fields at once reorders the draws, so the legacy global stream
+        # (where values are reproducible with earlier versions) is still drawn field by field
+        batch = getattr(dist, 'elementwise', False) and not modes and (self.rng is not None or workers is not None)
+        leaves = plan.groups if batch else plan.leaves
+
+        if density is not None:
+            if out is not None or layout != 'struct' or constraints is not None or processes or modes:
+                raise ValueError('argument `density` can not be combined with `out`, `layout`, `constraints`, '
+                                 '`processes` or generation modes')
+            return self._sparse(plan, leaves, shape, density, sparse_format, dist, type_limits)
+
+        if layout == 'columnar':
+            if out is not None:
+                raise ValueError('argument `out` can not be combined with the columnar layout')
+            if constraints is not None:
+                raise ValueError('argument `constraints` can not be combined with the columnar layout')
+            return self._columnar(plan, shape, dist, type_limits, workers, modes, mark)
+
+        r = None if out is None else self._check_out(plan, out, shape)
+        r_shape = to_tuple(shape) + plan.shape if r is None else r.shape
+        path = None
+        if processes and workers is not None and np.prod(r_shape) and (r is None or file_region(r) is None):
+            # worker processes can only share memory through a file
+            r, path = file_empty(r_shape, plan.dtype)
+        elif r is None:
+            r = np.empty(r_shape, dtype=plan.dtype)
+        if stats is not None and r is not out:
+            stats.output(r)
+        try:
+            self._generate(leaves, r, dist, type_limits, workers, modes, processes)
+        finally:
+            if path is not None:
+                remove_file(path)
+        if out is not None and r is not out:
+            out[...] = r
+            r = out
+        if mark is not None:
+            mark('fill')
+        # derived fields and constraints always see (at least 1-dimensional) rows of values
+        rows = r if r.ndim else r.reshape(1)
+        self._derive(plan, rows)
+        if mark is not None:
+            mark('derive')
+        if constraints is not None:
+            self._constrain(plan, leaves, rows, dist, type_limits, modes, constraints)
+            if mark is not None:
+                mark('constraints')
+
+        if out is not None:
+            return out
+        return r if r.ndim else r[()]
+
+    def stream(self, dtype, params, total=None, chunk=None, dist=None, type_limits=True, workers=None, reuse=False):
+        '''
+        Yields arrays of `chunk` (default `chunk_size`) random values of `dtype` each,
+        until `total` values have been generated (the last chunk may be shorter),
+        or forever if `total` is None. The rest of the arguments are the ones of `random`.
+        If `reuse` is True, the same buffer is refilled for every chunk, so each yielded
+        array is only valid until the next one is requested.
+        '''
+        if chunk is None:
+            chunk = self.chunk_size
+        if not isinstance(chunk, int) or chunk <= 0:
+            raise ValueError('argument `chunk` must be an integer greater than 0')
+        if total is not None and total < 0:
+            raise ValueError('argument `total` must be a number greater or equal to 0')
+
+        plan = self.compile(dtype, params)
+        buffer = None
+        generated = 0
+        while total is None or generated < total:
+            size = chunk if total is None else min(chunk, total - generated)
+            if reuse and (buffer is None or len(buffer) != size):
+                buffer = np.empty((size,) + plan.shape, dtype=plan.dtype)
+            yield self.random(dtype, params, size, dist, type_limits, workers, buffer)
+            generated += size
+
+    def agenerate(self, dtype, params, batch_size=None, total=None, prefetch=2, dist=None, type_limits=True,
+                  workers=None, reuse=True):
+        '''
+        Returns an asynchronous iterator over the batches of `stream`, for use in `async for` loops.
+        Up to `prefetch` batches are generated ahead of the consumer by a background thread,
+        into a ring of `prefetch + 1` reused buffers (if `reuse` is True, so each batch is only valid
+        until the next one is requested). The iterator can also be used in `async with` blocks, and
+        stops generating when it is closed (`aclose`) or the consumer is cancelled.
+        '''
+        if batch_size is None:
+            batch_size = self.chunk_size
+        if not isinstance(batch_size, int) or batch_size <= 0:
+            raise ValueError('argument `batch_size` must be an integer greater than 0')
+        if total is not None and total < 0:
+            raise ValueError('argument `total` must be a number greater or equal to 0')
+        if not isinstance(prefetch, int) or prefetch <= 0:
+            raise ValueError('argument `prefetch` must be an integer greater than 0')
+
+        from .batches import AsyncBatches
+        return AsyncBatches(self, dtype, params, batch_size, total, prefetch, reuse,
+                            dict(dist=dist, type_limits=type_limits, workers=workers))
+
+    def profile(self, stats=None):
+        '''
+        Returns a context manager that counts the work of this generator in a `Stats` object (`stats`, if given,
+        to accumulate several runs) while it is active, e.g. `with rand.profile() as stats: ...`.
+        Outside of it, generation is not instrumented at all.
+        '''
+        from .stats import Profile
+        return Profile(self, stats)
+
+    def _columnar(self, plan, shape, dist, type_limits, workers, modes, mark):
+        columns = Columns(to_tuple(shape) + plan.shape)
+        for leaf in plan.leaves:
+            column, base, leaf = column_leaf(leaf, columns.shape)
+            if base is not None:
+                self._generate([leaf], base, dist, type_limits, workers, modes)
+                if self._stats is not None:
+                    self._stats.output(base)
+            columns[leaf.name or 'value'] = column
+        if mark is not None:
+            mark('fill')
+        for derived in plan.derived:
+            columns[derived.name] = np.empty(columns.shape, dtype=derived.dtype)
+            columns[derived.name][...] = evaluate(derived.derive, columns)
+        if mark is not None:
+            mark('derive')
+        for name in plan.names:
+            columns.move_to_end(name or 'value')
+        return columns
+
+    def _check_out(self, plan, out, shape):
+        if not isinstance(out, np.ndarray) or out.dtype != plan.dtype:
+            raise TypeError('argument `out` must be a numpy array of dtype ' + str(plan.dtype))
+        if shape is None:
+            if out.shape[out.ndim - len(plan.shape):] != plan.shape:
+                raise ValueError('argument `out` must have a shape ending in ' + str(plan.shape))
+        elif out.shape != to_tuple(shape) + plan.shape:
+            raise ValueError('argument `out` must have shape ' + str(to_tuple(shape) + plan.shape))
+        return out
+
+    def _derive(self, plan, r):
+        for derived in plan.derived:
+            field(r, derived.name)[...] = evaluate(derived.derive, r)
+
+    def _constrain(self, plan, leaves, r, dist, type_limits, modes, constraints):
+        if callable(constraints) or isinstance(constraints, str):
+            constraints = [constraints]
+        predicates = [predicate(constraint) for constraint in constraints]
+        if any((leaf.modes or modes) and not leaf.shape for leaf in leaves):
+            raise ValueError('argument `constraints` can not be combined with generation modes of non-subarray fields')
+
+        def violations(values):
+            valid = np.ones(values.shape, dtype=bool)
+            for pred in predicates:
+                valid &= np.broadcast_to(np.asarray(pred(values), dtype=bool), values.shape)
+            return ~valid
+
+        # only the values that violate the constraints are drawn again (all of them at once)
+        index = np.nonzero(violations(r))
+        for _ in range(self.constraint_tries):
+            if not len(index[0]):
+                return
+            redrawn = np.empty(len(index[0]), dtype=plan.dtype)
+            fill([leaf.rows(index, r.shape) for leaf in leaves], redrawn, dist, type_limits, self.rng, modes,
+                 self._stats)
+            self._derive(plan, redrawn)
+            invalid = violations(redrawn)
+            r[index] = redrawn
+            index = tuple(i[invalid] for i in index)
+        raise ValueError('could not draw values satisfying the constraints after '
+                         + str(self.constraint_tries) + ' tries')
+
+    def _sparse(self, plan, leaves, shape, density, sparse_format, dist, type_limits):
+        if not isinstance(density, numbers.Real) or not 0 <= density <= 1:
+            raise ValueError('argument `density` must be a number in [0, 1]')
+        if sparse_format not in sparse_formats:
+            raise ValueError('unknown sparse format `' + str(sparse_format) + '`, expected one of '
+                             + ', '.join(sparse_formats))
+        shape = to_tuple(shape)
+        if not shape:
+            raise ValueError('argument `density` requires a `shape` of at least 1 dimension')
+        size = 1
+        for n in shape:
+            size *= n
+        indices = np.unravel_index(sample_positions(self.rng, size, density), shape)
+        values = np.empty((len(indices[0]),) + plan.shape, dtype=plan.dtype)
+        if self._stats is not None:
+            self._stats.output(values)
+        # array limits are picked at the positions of the nonzeros
+        fill([leaf.rows(indices, shape + plan.shape) for leaf in leaves], values, dist, type_limits, self.rng,
+             stats=self._stats)
+        self._derive(plan, values)
+        if plan.dtype.kind in 'biufc' and not plan.shape:
+            self._redraw_zeros(plan, leaves, shape, indices, values, dist, type_limits)
+        return sparse_output(indices, values, shape, sparse_format)
+
+    def _redraw_zeros(self, plan, leaves, shape, indices, values, dist, type_limits):
+        # the values at the positions of the nonzeros must not be zeros themselves
+        zeros = np.flatnonzero(values == 0)
+        for _ in range(self.constraint_tries):
+            if not zeros.size:
+                return
+            index = tuple(i[zeros] for i in indices)
+            redrawn = np.empty(len(zeros), dtype=plan.dtype)
+            fill([leaf.rows(index, shape) for leaf in leaves], redrawn, dist, type_limits, self.rng,
+                 stats=self._stats)
+            values[zeros] = redrawn
+            zeros = zeros[redrawn == 0]
+        if zeros.size:
+            raise ValueError('could not draw nonzero values within the limits after '
+                             + str(self.constraint_tries) + ' tries')
+
+    def _generate(self, leaves, r, dist, type_limits, workers, modes, processes=False):
+        if workers is None:
+            fill(leaves, r, dist, type_limits, self.rng, modes, self._stats)
+        else:
+            self._fill_chunks(leaves, r, dist, type_limits, workers, modes, processes)
+
+    def _fill_chunks(self, leaves, r, dist, type_limits, workers, modes=frozenset(), processes=False):
+        if not isinstance(workers, int) or workers < 1:
+            raise ValueError('argument `workers` must be an integer greater than 0')
+
+        # the modes of non-subarray fields span the whole output, so they can not be drawn in chunks
+        whole = [(leaf.modes or modes) and not leaf.shape for leaf in leaves]
+        if any(whole):
+            fill([leaf for leaf, w in zip(leaves, whole) if w], r, dist, type_limits, self.rng, modes, self._stats)
+            leaves = [leaf for leaf, w in zip(leaves, whole) if not w]
+
+        entropy = [int(x) for x in randint(self.rng, 0, 1 << 32, 4, np.dtype(np.uint32))]
+        bit_generator = np.random.PCG64 if self.rng is None else type(self.rng.bit_generator)
+
+        def task(chunk):
+            # the rows, their leaves and the seed of the `chunk`-th chunk, which is
+            # equivalent to the `chunk`-th child of `SeedSequence(entropy).spawn(...)`
+            seed = np.random.SeedSequence(entropy, spawn_key=(chunk,))
+            if not r.ndim:
+                return None, leaves, seed
+            rows = slice(chunk * self.chunk_size, (chunk + 1) * self.chunk_size)
+            return rows, [leaf.rows(rows, r.shape) for leaf in leaves], seed
+
+        chunks = -(-len(r) // self.chunk_size) if r.ndim else 1
+        if processes and workers > 1 and chunks > 1:
+            filename, offset = file_region(r)
+            tasks = []
+            for chunk in range(chunks):
+                rows, chunk_leaves, seed = task(chunk)
+                shape = r[rows].shape
+                tasks.append((filename, offset + rows.start * r.strides[0], r.dtype, shape,
+                              chunk_leaves, dist, type_limits, modes, bit_generator, seed, self._stats is not None))
+            for fields in self._process_pool(workers).map(fill_file, tasks):
+                if fields is not None:
+                    self._stats.merge(fields)
+            return
+
+        def fill_chunk(chunk):
+            rows, chunk_leaves, seed = task(chunk)
+            rng = np.random.Generator(bit_generator(seed))
+            fill(chunk_leaves, r if rows is None else r[rows], dist, type_limits, rng, modes, self._stats)
+
+        if workers == 1 or chunks <= 1:
+            for chunk in range(chunks):
+                fill_chunk(chunk)
+        else:
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(min(workers, chunks)) as executor:
+                list(executor.map(fill_chunk, range(chunks)))
+
+    def _seeded(self, plan, params, shape, seed, start, stop, cache, out, dist_arg, dist, type_limits, workers, modes,
+                mark):
+        dataset = to_tuple(shape)
+        if not dataset:
+            raise ValueError('argument `seed` requires a `shape` of at least 1 dimension')
+        start, stop = 0 if start is None else start, dataset[0] if stop is None else stop
+        if not isinstance(start, numbers.Integral) or not isinstance(stop, numbers.Integral) \
+                or not 0 <= start <= stop <= dataset[0]:
+            raise ValueError('arguments `start` and `stop` must be integers in [0, ' + str(dataset[0]) + ']'
+                             + ' with `start` <= `stop`')
+        shape = (stop - start,) + dataset[1:]
+        r = None if out is None else self._check_out(plan, out, shape)
+        if cache is not None:
+            if not isinstance(cache, DiskCache):
+                cache = DiskCache(cache)
+            # the streams of numpy may change between its versions, so its version is part of the key too
+            key = cache_key(__version__, np.__version__, plan.dtype, params, dist_arg, type_limits, dataset, seed,
+                            start, stop, tuple(mode for mode in mode_names if mode in modes), self.block_size)
+            cached = cache.load(key)
+            if mark is not None:
+                mark('cache')
+            if cached is not None:
+                if r is None:
+                    return cached
+                r[...] = cached
+                return r
+            if r is None:
+                return self._fill_cache(cache, key, plan, shape + plan.shape, dataset, start, seed, dist, type_limits,
+                                        workers, modes, mark)
+        if r is None:
+            r = np.empty(shape + plan.shape, dtype=plan.dtype)
+            if self._stats is not None:
+                self._stats.output(r)
+        self._fill_blocks(plan.leaves, r, dataset + plan.shape, start, seed, dist, type_limits, workers, modes)
+        if mark is not None:
+            mark('fill')
+        self._derive(plan, r)
+        if mark is not None:
+            mark('derive')
+        if cache is not None:
+            cache.store(key, r)
+            if mark is not None:
+                mark('cache')
+        return r
+
+    def _fill_cache(self, cache, key, plan, shape, dataset, start, seed, dist, type_limits, workers, modes, mark):
+        # the values are generated block by block straight into the new file of the cache, so they never need
+        # to fit in memory, and are then returned as a read-only memmap of it, like the cached values are
+        with cache.storing(key, plan.dtype, shape) as r:
+            if self._stats is not None:
+                self._stats.output(r)
+            self._fill_blocks(plan.leaves, r, dataset + plan.shape, start, seed, dist, type_limits, workers, modes)
+            if mark is not None:
+                mark('fill')
+            self._derive(plan, r)
+            if mark is not None:
+                mark('derive')
+        cached = cache.load(key)
+        if mark is not None:
+            mark('cache')
+        return r if cached is None else cached
+
+    def _fill_blocks(self, leaves, r, shape, start, seed, dist, type_limits, workers, modes):
+        if any((leaf.modes or modes) and not leaf.shape for leaf in leaves):
+            raise ValueError('argument `seed` can not be combined with generation modes of non-subarray fields')
+        if workers is not None and (not isinstance(workers, int) or workers < 1):
+            raise ValueError('argument `workers` must be an integer greater than 0')
+
+        key = np.random.SeedSequence(seed).generate_state(2, np.uint64)
+        size = self.block_size
+        stop = start + len(r)
+
+        def fill_block(block):
+            rows = slice(block * size, min((block + 1) * size, shape[0]))
+            inside = slice(max(rows.start, start) - start, min(rows.stop, stop) - start)
+            # blocks that overlap the edges of the requested rows are drawn whole, then trimmed
+            whole = rows.start >= start and rows.stop <= stop
+            values = r[inside] if whole else np.empty((rows.stop - rows.start,) + r.shape[1:], dtype=r.dtype)
+            for index, leaf in enumerate(leaves):
+                rng = np.random.Generator(np.random.Philox(key=key, counter=[0, 0, index, block]))
+                fill([leaf.rows(rows, shape)], values, dist, type_limits, rng, modes, self._stats)
+            if not whole:
+                r[inside] = values[inside.start + start - rows.start:inside.stop + start - rows.start]
+
+        blocks = range(start // size, -(-stop // size)) if stop > start else range(0)
+        if workers is None or workers == 1 or len(blocks) <= 1:
+            for block in blocks:
+                fill_block(block)
+        else:
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(min(workers, len(blocks))) as executor:
+                list(executor.map(fill_block, blocks))
+
+def fill(leaves, r, dist, type_limits, rng, modes=frozenset(), stats=None):
+    '''
+    Fills the fields of `leaves` inside `r` with values drawn from `rng`, counting them in `stats`, if given.
+    '''
+    if stats is not None:
+        return stats.fill(fill_leaf, leaves, r, dist, type_limits, rng, modes)
+    for leaf in leaves:
+        fill_leaf(leaf, r, dist, type_limits, rng, modes)
+
+def fill_leaf(leaf, r, dist, type_limits, rng, modes):
+    '''
+    Fills the field of `leaf` inside `r`, and returns whether its values had to be drawn into a new array.
+    '''
+    field = leaf.view(r)
+    if leaf.modes or modes:
+        leaf_dist = dist if leaf.dist is None else leaf.dist
+        field[...] = sample_modes(leaf_dist, dist_caller(leaf_dist), leaf, r.shape, type_limits, rng,
+                                  leaf.modes | modes)
+        return True
+    values = leaf.sampler(dist, type_limits)(rng, r.shape + leaf.shape or None, field)
+    if values is not field:
+        field[...] = values
+        return True
+    return False
+
+def draw_scalar(scalar, rng):
+    '''
+    Draws a single value with the (dtype, sampler) `scalar`, the same one that `random` would draw.
+    '''
+    dtype, sample = scalar
+    r = np.empty((), dtype=dtype)
+    values = sample(rng, None, r)
+    if values is not r:
+        r[...] = values
+    return r[()]
+
+def fill_file(task):
+    '''
+    Fills the rows of a file-backed output described by `task` in a worker process,
+    and returns the `Stats.fields` of the filling, if they were requested.
+    '''
+    filename, offset, dtype, shape, leaves, dist, type_limits, modes, bit_generator, seed, profiled = task
+    r = np.memmap(filename, dtype=dtype, mode='r+', offset=offset, shape=shape)
+    stats = None
+    if profiled:
+        from .stats import Stats
+        stats = Stats()
+    fill(leaves, r, dist, type_limits, np.random.Generator(bit_generator(seed)), modes, stats)
+    r.flush()
+    return None if stats is None else stats.fields
+
+def file_region(arr):
+    '''
+    Returns the name of the file that the C-contiguous memmap `arr` maps, and the offset of its values in it,
+    or None if `arr` is not such a memmap.
+    '''
+    if not isinstance(arr, np.memmap) or not arr.flags.c_contiguous or not arr.flags.writeable:
+        return None
+    root = arr
+    while isinstance(root.base, np.memmap):
+        root = root.base
+    if root.filename is None:
+        return None
+    return root.filename, root.offset + arr.ctypes.data - root.ctypes.data
+
+def remove_file(path):
+    import os
+    try:
+        # on POSIX systems, the memmap outlives the name of its file
+        os.remove(path)
+    except OSError:
+        pass
+
+def file_empty(shape, dtype):
+    '''
+    Returns a new memmap of `shape` and `dtype`, backed by a temporary file, along with the path of the file.
+    '''
+    import os
+    import tempfile
+    fd, path = tempfile.mkstemp(prefix='rvg-', suffix='.bin')
+    os.close(fd)
+    return np.memmap(path, dtype=dtype, mode='w+', shape=shape), path
@@ -0,0 +1,237 @@
+from collections import namedtuple, OrderedDict
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
+from .derive import derived_field, order
+from .dists import get_dist
+from .modes import mode_names
+from .utils import isscalar, isspec, issubarray, isstruct, maybe_dict_get, sampler
+
+class Leaf(namedtuple('Leaf', ['name', 'offset', 'dtype', 'shape', 'strides', 'params', 'dist', 'options', 'modes',
+                               'resolved'])):
+    '''
+    A single scalar field of a (possibly nested) dtype.
+        name:    dotted path of the field, e.g. 'a.f0' ('' for non-struct dtypes)
+        offset:  byte offset of the field inside one top-level element
+        dtype:   the scalar dtype of the field
+        shape:   the accumulated shape of all subarrays enclosing the field
+        strides: the byte strides that go along with `shape`
+        params:  the distribution parameters (i.e. limits) resolved for the field
+        dist:    the distribution of the field, if its params define one (else None)
+        options: the rest of the keys of the field's params, passed to `dist` as keyword arguments
+        modes:   the generation modes (see `sample_modes`) enabled by the field's params
+        resolved: what is resolved once for the leaf, on first use: its samplers (see `sampler`)
+                 and the dtype of its views (see `view`)
+    '''
+    __slots__ = ()
+
+    def view(self, arr):
+        '''
+        Returns a writeable view of this field inside `arr`,
+        an array of the plan's dtype, with shape `arr.shape + self.shape`.
+        '''
+        if arr.dtype == self.dtype:
+            if not self.shape:
+                return arr
+            return as_strided(arr, arr.shape + self.shape, arr.strides + self.strides)
+        view_dtype = self.resolved.get('view')
+        if view_dtype is None:
+            view_dtype = self.resolved['view'] = self._view_dtype()
+        if view_dtype is not False:
+            return arr.getfield(view_dtype, self.offset)
+        field = arr.getfield(self.dtype, self.offset)
+        return as_strided(field, arr.shape + self.shape, arr.strides + self.strides)
+
+    def _view_dtype(self):
+        # contiguous subarrays are viewed as fields of a subarray dtype, which is much cheaper
+        # than striding a view of their first item (False if they are not contiguous)
+        if not self.shape:
+            return self.dtype
+        size = self.dtype.itemsize
+        for n, stride in zip(reversed(self.shape), reversed(self.strides)):
+            if stride != size:
+                return False
+            size *= n
+        return np.dtype((self.dtype, self.shape))
+
+    def sampler(self, dist, type_limits):
+        '''
+        Returns the sampler of the values of this leaf (see `sampler`), with `dist` as its distribution,
+        unless it has its own. Samplers are resolved once per (dist, type_limits) and kept in `resolved`.
+        '''
+        dist = dist if self.dist is None else self.dist
+        try:
+            return self.resolved[dist, type_limits]
+        except KeyError:
+            sample = self.resolved[dist, type_limits] = sampler(self.dtype, self.params, dist, type_limits,
+                                                                self.options)
+            return sample
+        except TypeError:
+            # unhashable distributions are resolved on every call
+            return sampler(self.dtype, self.params, dist, type_limits, self.options)
+
+    def has_array_limits(self):
+        '''
+        Returns whether any limit of this leaf is an array (or a list), e.g. one limit per row.
+        '''
+        if isinstance(self.params, (list, tuple)) and len(self.params) == 2:
+            return any(np.ndim(limit) for limit in self.params)
+        return bool(np.ndim(self.params))
+
+    def rows(self, index, shape):
+        '''
+        Returns this leaf for the rows `index` (a slice or an index array) of an output of `shape`,
+        with the limits that are arrays broadcast to the output and indexed accordingly.
+        '''
+        def sliced(limit):
+            if isinstance(limit, (list, tuple)):
+                limit = np.asarray(limit)
+            if isinstance(limit, np.ndarray) and limit.ndim:
+                return np.broadcast_to(limit, shape + self.shape)[index]
+            return limit
+
+        if isinstance(self.params, np.ndarray):
+            return self._replace(params=sliced(self.params), resolved={})
+        if isinstance(self.params, (list, tuple)) and len(self.params) == 2:
+            return self._replace(params=tuple(sliced(limit) for limit in self.params), resolved={})
+        return self
+
+class Plan:
+    '''
+    A dtype and its params flattened once into a list of leaf operations.
+    Generation of values then only has to run the sampler of each leaf,
+    instead of walking the whole dtype tree again.
+    `groups` holds the same leaves, with the ones that can be drawn at once merged (see `_group`).
+    `derived` holds the fields that are computed from the others (in dependency order),
+    and `names` the names of all leaves and derived fields, in the order of the dtype.
+    '''
+    def __init__(self, dtype, params):
+        dtype = np.dtype(dtype)
+        shape = ()
+        # top-level subarrays are expanded by numpy into the array shape
+        while issubarray(dtype):
+            dtype, sub_shape = dtype.subdtype
+            shape += sub_shape
+        self.dtype = dtype
+        self.shape = shape
+        self.leaves = []
+        self.derived = []
+        self.names = []
+        self._flatten(dtype, params, '', 0, (), ())
+        self.groups = self._group()
+        self.derived = order(self.derived)
+
+    def _flatten(self, dtype, params, name, offset, shape, strides):
+        if isinstance(params, dict) and 'derive' in params and isspec(params, dtype):
+            if not name:
+                raise ValueError('only the fields of a struct can be derived')
+            # the shape of the enclosing subarrays is part of the values of the field
+            self.derived.append(derived_field(name, np.dtype((dtype, shape)) if shape else dtype, params))
+            self.names.append(name)
+        elif isstruct(dtype):
+            for field_name in dtype.names:
+                field = dtype.fields[field_name]
+                # there may be titles, in which case fields are named ('title', 'name')
+                key = field_name if len(field) == 2 else (field[2], field_name)
+                self._flatten(
+                    field[0],
+                    params if isspec(params, dtype) else maybe_dict_get(params, key),
+                    name + '.' + field_name if name else field_name,
+                    offset + field[1],
+                    shape,
+                    strides
+                )
+        elif issubarray(dtype):
+            item_dtype, sub_shape = dtype.subdtype
+            sub_strides = tuple(int(np.prod(sub_shape[i + 1:])) * item_dtype.itemsize for i in range(len(sub_shape)))
+            self._flatten(item_dtype, params, name, offset, shape + sub_shape, strides + sub_strides)
+        elif isscalar(dtype):
+            if isinstance(params, dict):
+                options = dict(params)
+                dist = get_dist(options.pop('dist', None))
+                params = options.pop('limits', None)
+                modes = frozenset(mode for mode in mode_names if options.pop(mode, False))
+            else:
+                dist, options, modes = None, {}, frozenset()
+            self.leaves.append(Leaf(name, offset, dtype, shape, strides, params, dist, options, modes, {}))
+            self.names.append(name)
+        else:
+            raise NotImplementedError(dtype)
+
+    def _group(self):
+        '''
+        Merges the leaves that share their dtype, params (and elementwise dist) and subarray layout,
+        and whose offsets are evenly spaced, into single leaves with an extra leading axis of that
+        spacing as its stride, so that a single draw and a single strided write fill all of them.
+        '''
+        buckets = OrderedDict()
+        for leaf in self.leaves:
+            params_key = freeze((leaf.params, leaf.dist, leaf.options))
+            # the modes of a leaf apply to its own values only, and array limits broadcast
+            # against its own shape, which the extra axis of a group would shift
+            if params_key is None or leaf.modes or leaf.has_array_limits() \
+                    or not (leaf.dist is None or getattr(leaf.dist, 'elementwise', False)):
+                params_key = id(leaf)
+            key = (leaf.dtype, leaf.shape, leaf.strides, params_key)
+            buckets.setdefault(key, []).append(leaf)
+
+        runs = []
+        for leaves in buckets.values():
+            run = [leaves[0]]
+            for leaf in leaves[1:]:
+                step = leaf.offset - run[-1].offset
+                if step and (len(run) == 1 or step == run[1].offset - run[0].offset):
+                    run.append(leaf)
+                else:
+                    runs.append(run)
+                    run = [leaf]
+            runs.append(run)
+
+        groups = []
+        for run in sorted(runs, key=lambda run: self.leaves.index(run[0])):
+            if len(run) == 1:
+                groups.append(run[0])
+                continue
+            first = run[0]
+            groups.append(Leaf(
+                ','.join(leaf.name for leaf in run),
+                first.offset,
+                first.dtype,
+                (len(run),) + first.shape,
+                (run[1].offset - first.offset,) + first.strides,
+                first.params,
+                first.dist,
+                first.options,
+                first.modes,
+                {}
+            ))
+        return groups
+
+def freeze(params):
+    '''
+    Returns a hashable key describing `params`, or None if `params` can not be hashed.
+    '''
+    if isinstance(params, dict):
+        items = tuple((k, freeze(v)) for k, v in params.items())
+        return None if any(v is None for _, v in items) else (dict, items)
+    if isinstance(params, (list, tuple)):
+        items = tuple(freeze(v) for v in params)
+        return None if any(v is None for v in items) else (type(params), items)
+    try:
+        hash(params)
+    except TypeError:
+        return None
+    return (type(params), params)
+
+def thaw(key):
+    '''
+    Returns a copy of the params that `freeze` returned `key` for, which compares equal to them
+    (as long as they are not changed), sharing only the values that are not dicts, lists or tuples.
+    '''
+    kind, items = key
+    if kind is dict:
+        return {k: thaw(v) for k, v in items}
+    if issubclass(kind, list):
+        return [thaw(v) for v in items]
+    if issubclass(kind, tuple):
+        return tuple(thaw(v) for v in items)
+    return items
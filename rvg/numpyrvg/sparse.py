@@ -0,0 +1,31 @@
+import numpy as np
+from .columnar import optional_import
+from .modes import unique_ints
+
+# the forms of sparse outputs: scipy.sparse matrices, or the indices of the nonzeros along with their values
+sparse_formats = ('coo', 'csr', 'indices')
+
+def sample_positions(rng, size, density):
+    '''
+    Returns the sorted flat positions of the nonzeros of an array of `size` values, each of which
+    is nonzero with probability `density`. Their number is drawn from the binomial distribution, then
+    they are sampled without replacement, so the cost scales with their number rather than with `size`.
+    '''
+    nnz = int((np.random if rng is None else rng).binomial(size, density)) if size else 0
+    positions = unique_ints(rng, nnz, size).astype(np.int64)
+    positions.sort()
+    return positions
+
+def sparse_output(indices, values, shape, sparse_format):
+    '''
+    Returns the nonzero `values` at `indices` (a tuple of index arrays, one per dimension) of an array of `shape`
+    as a tuple `(indices, values)`, or as a `scipy.sparse` matrix in COO or CSR format.
+    '''
+    if sparse_format == 'indices':
+        return indices, values
+    if len(shape) != 2 or values.ndim != 1 or values.dtype.names:
+        raise ValueError('sparse format `' + sparse_format + '` requires a 2-dimensional shape '
+                         'and a dtype without fields or subarrays')
+    sp = optional_import('scipy.sparse', 'scipy')
+    matrix = sp.coo_matrix((values, indices), shape=shape)
+    return matrix.tocsr() if sparse_format == 'csr' else matrix
@@ -0,0 +1,160 @@
+from collections import OrderedDict
+import threading
+import time
+
+counters = ('calls', 'seconds', 'bytes', 'values', 'allocations', 'draws')
+
+class Stats:
+    '''
+    Counters of the generation of values, collected while `NumPyRVG.profile` is active:
+        fields: for each field (or group of fields drawn at once, see `Plan.groups`) that was filled,
+                its `calls`, `seconds`, `bytes` and `values` written, `allocations` of intermediate arrays
+                (when the values could not be drawn straight into the output) and random `draws`, i.e.
+                calls to the methods of the `numpy.random.Generator` (or to the sampler, for the global state)
+        phases: the `seconds` spent in each phase of `random` (compile, fill, derive, constraints, total)
+    and the totals of all fields, along with the outputs allocated by `random` itself.
+    '''
+    def __init__(self):
+        self.fields = OrderedDict()
+        self.phases = OrderedDict()
+        self.calls = 0
+        self.outputs = 0
+        self.output_bytes = 0
+        self._lock = threading.Lock()
+
+    clock = staticmethod(time.perf_counter)
+
+    def timer(self):
+        '''
+        Counts a call of `random`, and returns a function that adds the time since it was last called
+        (or since the call started) to the phase it is called with, and to the total.
+        '''
+        last = [self.clock()]
+        with self._lock:
+            self.calls += 1
+
+        def mark(phase):
+            now = self.clock()
+            self.phase(phase, now - last[0])
+            self.phase('total', now - last[0])
+            last[0] = now
+        return mark
+
+    def field(self, name, **amounts):
+        with self._lock:
+            record = self.fields.get(name)
+            if record is None:
+                record = self.fields[name] = OrderedDict((counter, 0) for counter in counters)
+            for counter, amount in amounts.items():
+                record[counter] += amount
+
+    def phase(self, name, seconds):
+        with self._lock:
+            self.phases[name] = self.phases.get(name, 0) + seconds
+
+    def output(self, arr):
+        with self._lock:
+            self.outputs += 1
+            self.output_bytes += arr.nbytes
+
+    def merge(self, fields):
+        '''
+        Adds the counters of `fields` (e.g. the `fields` of the `Stats` of a worker process) to these ones.
+        '''
+        for name, record in fields.items():
+            self.field(name, **record)
+
+    def totals(self):
+        return OrderedDict(
+            (counter, sum(record[counter] for record in self.fields.values())) for counter in counters
+        )
+
+    def fill(self, fill_leaf, leaves, r, dist, type_limits, rng, modes):
+        '''
+        Fills the fields of `leaves` inside `r` like `fill`, one `fill_leaf` at a time, counting what each one does.
+        '''
+        for leaf in leaves:
+            counted = None if rng is None else CountingRNG(rng)
+            began = self.clock()
+            allocated = fill_leaf(leaf, r, dist, type_limits, counted, modes)
+            seconds = self.clock() - began
+            field = leaf.view(r)
+            self.field(
+                leaf.name or 'value', calls=1, seconds=seconds, bytes=field.nbytes, values=field.size,
+                allocations=int(allocated), draws=1 if counted is None else counted.draws
+            )
+
+    def to_dict(self):
+        return OrderedDict([
+            ('calls', self.calls),
+            ('outputs', self.outputs),
+            ('output_bytes', self.output_bytes),
+            ('phases', self.phases),
+            ('totals', self.totals()),
+            ('fields', self.fields)
+        ])
+
+    def to_json(self, **kwargs):
+        import json
+        return json.dumps(self.to_dict(), **kwargs)
+
+class Profile:
+    '''
+    The context manager of `NumPyRVG.profile`.
+    '''
+    def __init__(self, rvg, stats=None):
+        self.rvg = rvg
+        self.stats = Stats() if stats is None else stats
+        self._previous = None
+
+    def __enter__(self):
+        self._previous = self.rvg.__dict__.get('_stats')
+        self.rvg._stats = self.stats
+        return self.stats
+
+    def __exit__(self, *exc_info):
+        if self._previous is None:
+            del self.rvg._stats
+        else:
+            self.rvg._stats = self._previous
+
+class CountingRNG:
+    '''
+    A proxy of the `numpy.random.Generator` `rng` that counts the calls to its methods.
+    '''
+    def __init__(self, rng):
+        self._rng = rng
+        self.draws = 0
+
+    def __getattr__(self, name):
+        attr = getattr(self._rng, name)
+        if name == 'bit_generator':
+            # raw bits are drawn straight from the bit generator (see `random_bits`)
+            return CountingBitGenerator(attr, self)
+        if not callable(attr):
+            return attr
+
+        def method(*args, **kwargs):
+            self.draws += 1
+            return attr(*args, **kwargs)
+        return method
+
+class CountingBitGenerator:
+    '''
+    A proxy of the bit generator of a `CountingRNG`, which counts its raw draws as draws of the `CountingRNG`.
+    It passes for the proxied bit generator in `isinstance` checks.
+    '''
+    def __init__(self, bit_generator, counter):
+        self._bit_generator = bit_generator
+        self._counter = counter
+
+    @property
+    def __class__(self):
+        return type(self._bit_generator)
+
+    def random_raw(self, *args, **kwargs):
+        self._counter.draws += 1
+        return self._bit_generator.random_raw(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._bit_generator, name)
@@ -1,31 +1,343 @@
+from functools import lru_cache, partial
+import math
 import numpy as np
 
-def uniform_dist(dtype, params, shape, type_limits):
+bit_generators = ('PCG64', 'PCG64DXSM', 'Philox', 'SFC64', 'MT19937')
 
+# the characters of generated strings, if no `alphabet` is given
+default_alphabet = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789'
+
+def uniform_dist(dtype, params, shape, type_limits, rng=None, out=None, p=0.5, alphabet=None, length=None):
+    '''
+    Draws values of `dtype` uniformly from the limits described by `params`.
+    If `out` is given, the values may be written straight into it, in which case it is returned.
+    Besides numbers, the kinds of values that can be drawn are:
+        bool:                  True with probability `p` (`params` are ignored)
+        complex:               real and imaginary parts drawn independently from the limits
+        datetime64:            dates within the limits, which can be anything `numpy.datetime64` accepts
+                               (e.g. `('2020-01-01', '2021-01-01')`), in the unit of `dtype`
+        timedelta64:           durations within the limits, in the unit of `dtype` (or `numpy.timedelta64`s)
+        bytes/str (`S`/`U`):   strings of characters of `alphabet` (default letters and digits),
+                               with a `length` that is either fixed or a (min, max) range
+                               (default the width of `dtype`; `params` are ignored)
+    '''
+    return uniform_sampler(dtype, params, type_limits, p, alphabet, length)(rng, shape, out)
+
+# dists that draw each value independently of the shape they are asked for are marked
+# as `elementwise`, so that fields sharing their dtype and params can be drawn at once
+uniform_dist.elementwise = True
+
+def sampler(dtype, params, dist, type_limits, options):
+    '''
+    Returns a function `sample(rng, shape, out)` that draws values of `dtype` from `dist`,
+    like `dist(dtype, params, shape, type_limits, rng=rng, out=out, **options)` does, but with everything
+    that does not depend on the draw (e.g. the limits of `uniform_dist`, clipped to the type) resolved once.
+    '''
+    if dist is uniform_dist:
+        return uniform_sampler(dtype, params, type_limits, **options)
+    return partial(draw_dist, dist, dtype, params, type_limits, options)
+
+def draw_dist(dist, dtype, params, type_limits, options, rng, shape, out):
+    return dist_caller(dist)(dtype, params, shape, type_limits, rng, out, **options)
+
+def uniform_sampler(dtype, params, type_limits, p=0.5, alphabet=None, length=None):
+    '''
+    Returns the sampler (see `sampler`) of `uniform_dist` for values of `dtype`.
+    '''
+    if dtype.kind == 'b':
+        return partial(draw_bools, p)
+    if dtype.kind in 'SU':
+        return string_sampler(dtype, alphabet, length)
+    if dtype.kind in 'mM':
+        low, high = time_limits(dtype, params, type_limits)
+        return partial(draw_times, dtype, low, high)
+    if dtype.kind == 'c':
+        part = np.dtype('f' + str(dtype.itemsize // 2))
+        return partial(draw_complex, dtype, uniform_sampler(part, params, type_limits))
+    if np.issubdtype(dtype, np.integer):
+        low, high = int_limits(dtype, params, type_limits)
+        return partial(draw_ints, dtype, low, high, full_range(dtype, low, high))
+    if np.issubdtype(dtype, np.floating):
+        low, high = split_limits(params)
+        if type_limits:
+            low, high = clip_limits(low, high, np.finfo(dtype))
+        return float_sampler(dtype, low, high)
+    raise NotImplementedError('no known uniform distribution for dtype ' + str(dtype))
+
+def split_limits(params):
+    '''
+    Returns the (low, high) limits described by `params`, which is either `(low, high)` or `limit`,
+    for (-limit, limit). Each limit is either a scalar or an array (a list is taken as an array),
+    that broadcasts against the shape of the values, e.g. to give each row or column its own limits.
+    An array given as `params` itself is always a `limit`.
+    '''
+    if isinstance(params, np.ndarray):
+        return -params, params
     try:
         low, high = params
     except TypeError:
-        low, high = -params, params
+        return -params, params
+    return tuple(np.asarray(limit) if isinstance(limit, (list, tuple)) else limit for limit in (low, high))
 
-    if np.issubdtype(dtype, np.signedinteger):
-        if type_limits:
-            type_limits_info = np.iinfo(dtype)
-            low = max(low, type_limits_info.min)
-            high = min(high, type_limits_info.max)
+def clip_limits(low, high, info):
+    '''
+    Returns the limits `low` and `high` clipped to the range of the type described by `info`.
+    '''
+    if np.ndim(low) or np.ndim(high):
+        return np.maximum(low, info.min), np.minimum(high, info.max)
+    return max(low, info.min), min(high, info.max)
+
+def int_limits(dtype, params, type_limits):
+    '''
+    Returns the limits [low, high) that `uniform_dist` draws integers of `dtype` from.
+    Limits beyond the range of `dtype` are clipped to [min, max + 1), so that its whole range,
+    maximum included, can be drawn. Float limits are rounded up to the integers they bound.
+    '''
+    low, high = split_limits(params)
+    if np.ndim(low) or np.ndim(high):
+        return int_array_limits(dtype, low, high, type_limits)
+    if type_limits:
+        info = np.iinfo(dtype)
+        low, high = max(low, int(info.min)), min(high, int(info.max) + 1)
+    low, high = (int(math.ceil(limit)) if isinstance(limit, (float, np.floating)) else limit for limit in (low, high))
+    if dtype.kind == 'u':
+        low = max(low, 0)
+    if low >= high:
+        raise ValueError('no value of ' + str(dtype) + ' lies within the limits ' + str(params))
+    return low, high
+
+def int_array_limits(dtype, low, high, type_limits):
+    '''
+    Returns the limits of `int_limits` when any of them is an array. They are rounded and clipped as
+    Python integers (in object arrays), since no integer dtype holds the ranges of both int64 and uint64.
+    They are then cast to `dtype` if they fit in it (a high limit may be its maximum + 1), else to int64.
+    '''
+    info = np.iinfo(dtype)
+    as_int = np.frompyfunc(int, 1, 1)
+    limits = []
+    for limit in (low, high):
+        limit = np.asarray(limit)
+        if limit.dtype.kind == 'f':
+            limit = np.ceil(limit)
+        limits.append(np.asarray(as_int(limit), dtype=object))
+    low, high = limits
+    if type_limits:
+        low, high = np.maximum(low, int(info.min), dtype=object), np.minimum(high, int(info.max) + 1, dtype=object)
+    if dtype.kind == 'u':
+        low = np.maximum(low, 0, dtype=object)
+    # both limits are cast to the same dtype, since numpy can not draw from limits of mixed dtypes
+    for info, limit_dtype in ((info, dtype), (np.iinfo(np.int64), np.int64)):
+        if all(np.all((limit >= int(info.min)) & (limit <= int(info.max))) for limit in (low, high)):
+            return np.asarray(low, dtype=limit_dtype), np.asarray(high, dtype=limit_dtype)
+    return np.asarray(low, dtype=object), np.asarray(high, dtype=object)
+
+@lru_cache(maxsize=None)
+def raw_bit_generators():
+    '''
+    Returns the bit generators whose raw output is 64 random bits.
+    '''
+    return tuple(getattr(np.random, name) for name in ('PCG64', 'PCG64DXSM', 'Philox', 'SFC64') if hasattr(np.random, name))
+
+def full_range(dtype, low, high):
+    '''
+    Returns whether [low, high) is the whole range of the integer type `dtype`, narrower than 64 bits,
+    in which case draws from a Generator are served by the raw bits of its bit generator.
+    '''
+    if dtype.kind not in 'iu' or dtype.itemsize >= 8 or np.ndim(low) or np.ndim(high):
+        return False
+    info = np.iinfo(dtype)
+    return low == info.min and high == int(info.max) + 1
+
+def randint(rng, low, high, shape, dtype):
+    '''
+    Draws integers of `dtype` from [low, high), where `high` may be the maximum of `dtype` + 1.
+    '''
+    return draw_ints(dtype, low, high, full_range(dtype, low, high), rng, shape, None)
+
+def draw_ints(dtype, low, high, bits, rng, shape, out):
+    '''
+    Draws the integers of `randint`, with `bits` (see `full_range`) resolved beforehand, as the
+    samplers of integer fields do once per field.
+    '''
+    if rng is None:
         return np.random.randint(low, high, shape, dtype.type)
-    if np.issubdtype(dtype, np.unsignedinteger):
-        if type_limits:
-            type_limits_info = np.iinfo(dtype)
-            low = max(low, type_limits_info.min)
-            high = min(high, type_limits_info.max)
-        return np.random.randint(max(low, 0), high, shape, dtype.type)
-    if np.issubdtype(dtype, np.floating):
-        if type_limits:
-            type_limits_info = np.finfo(dtype)
-            low = max(low, type_limits_info.min)
-            high = min(high, type_limits_info.max)
+    if bits and isinstance(rng.bit_generator, raw_bit_generators()):
+        return random_bits(rng, shape, dtype)
+    return rng.integers(low, high, shape, dtype.type)
+
+def random_bits(rng, shape, dtype):
+    '''
+    Returns values of `dtype` made of raw random bits, i.e. uniform over the whole range of `dtype`.
+    '''
+    n = 1
+    for size in to_tuple(shape):
+        n *= size
+    vals = rng.bit_generator.random_raw(-(-n * dtype.itemsize // 8)).view(dtype)[:n]
+    return vals[0] if shape is None else vals.reshape(shape)
+
+def float_sampler(dtype, low, high):
+    '''
+    Returns the sampler of floats drawn uniformly from [low, high), which draws them through a Generator
+    by scaling a unit draw in place, in the precision of `dtype`.
+    `numpy` can only draw float32 and float64 values natively, so float16 values
+    are drawn as float32 and longdouble values as float64, and are then cast to `dtype`.
+    '''
+    sample_dtype = np.dtype(np.float32 if dtype.itemsize <= 4 else np.float64)
+    if np.ndim(low) or np.ndim(high):
+        low, high = np.asarray(low, dtype=np.float64), np.asarray(high, dtype=np.float64)
+    else:
+        low, high = float(low), float(high)
+    # the range itself may overflow, but halves of it (and the results) do not
+    halves = not np.all(high - low <= float(np.finfo(sample_dtype).max))
+    return partial(draw_floats, sample_dtype, low, high, halves)
+
+def draw_floats(sample_dtype, low, high, halves, rng, shape, out):
+    '''
+    Draws the floats of `float_sampler`; if `out` is given and it can be filled in place, it is returned.
+    '''
+    if rng is None:
         return np.random.uniform(low, high, shape)
-    raise NotImplementedError('no known uniform distribution for dtype ' + dtype)
+    if out is not None and out.dtype == sample_dtype and iscarray(out):
+        vals = rng.random(dtype=sample_dtype, out=out)
+    else:
+        vals = rng.random(shape, dtype=sample_dtype)
+        if not isinstance(vals, np.ndarray):
+            return sample_dtype.type(low + vals * (high - low))
+
+    if halves:
+        vals *= high / 2 - low / 2
+        vals += low / 2
+        vals *= 2
+    else:
+        vals *= high - low
+        vals += low
+    return vals
+
+def draw_bools(p, rng, shape, out):
+    vals = (np.random if rng is None else rng).random(shape) < p
+    return vals if shape is not None else np.bool_(vals)
+
+def time_limits(dtype, params, type_limits):
+    '''
+    Returns the limits [low, high) described by `params` for datetime64 or timedelta64 values of `dtype`,
+    as int64 counts of the unit of `dtype`. Limits that are plain numbers are taken as counts of that unit.
+    '''
+    unit, count = np.datetime_data(dtype)
+    if unit == 'generic':
+        raise NotImplementedError('no known uniform distribution for dtype ' + str(dtype) + ' without a unit')
+    unit_dtype = np.dtype(dtype.kind + '8[' + str(count) + unit + ']')
+    low, high = (np.array(limit, dtype=unit_dtype).view(np.int64) for limit in split_limits(params))
+    low, high = (limit if limit.ndim else int(limit) for limit in (low, high))
+    if type_limits:
+        # the smallest int64 is NaT
+        low, high = clip_limits(low, high, np.iinfo(np.int64))
+        low = np.maximum(low, np.iinfo(np.int64).min + 1) if np.ndim(low) else max(low, np.iinfo(np.int64).min + 1)
+    return low, high
+
+def draw_times(dtype, low, high, rng, shape, out):
+    vals = np.asarray(randint(rng, low, high, shape, np.dtype(np.int64))).view(dtype.newbyteorder('='))
+    vals = vals.astype(dtype, copy=False)
+    return vals if shape is not None else vals[()]
+
+def draw_complex(dtype, part, rng, shape, out):
+    # real and imaginary parts are drawn independently, by the sampler `part` of their floats
+    vals = np.empty(to_tuple(shape), dtype=dtype)
+    vals.real = part(rng, shape, None)
+    vals.imag = part(rng, shape, None)
+    return vals if shape is not None else vals[()]
+
+def string_sampler(dtype, alphabet=None, length=None):
+    '''
+    Returns the sampler of fixed-width strings of `dtype` (bytes or str) made of characters of `alphabet`,
+    with `length` characters (an integer or an inclusive (min, max) range; default the width of `dtype`).
+    All characters are drawn into a single uint8 (bytes) or uint32 (str) buffer, which is then viewed as `dtype`.
+    '''
+    char = np.dtype(np.uint8 if dtype.kind == 'S' else np.uint32)
+    width = dtype.itemsize // char.itemsize
+    alphabet = default_alphabet if alphabet is None else alphabet
+    if dtype.kind == 'S':
+        chars = np.frombuffer(alphabet if isinstance(alphabet, bytes) else alphabet.encode('latin-1'), dtype=char)
+    else:
+        chars = np.array([ord(c) for c in alphabet], dtype=char)
+    if not len(chars):
+        raise ValueError('argument `alphabet` must contain at least 1 character')
+
+    length = width if length is None else length
+    try:
+        min_length, max_length = length
+    except TypeError:
+        min_length, max_length = length, length
+    if not 0 <= min_length <= max_length <= width:
+        raise ValueError('argument `length` must be within [0, ' + str(width) + '] for dtype ' + str(dtype))
+    return partial(draw_strings, dtype, chars, min_length, max_length)
+
+def draw_strings(dtype, chars, min_length, max_length, rng, shape, out):
+    width = dtype.itemsize // chars.itemsize
+    count = int(np.prod(to_tuple(shape)))
+    buffer = chars[randint(rng, 0, len(chars), (count, width), np.dtype(np.intp))]
+    if min_length < width:
+        lengths = randint(rng, min_length, max_length + 1, (count, 1), np.dtype(np.intp))
+        buffer[np.arange(width) >= lengths] = 0
+    vals = buffer.view(dtype.newbyteorder('=')).reshape(to_tuple(shape)).astype(dtype, copy=False)
+    return vals if shape is not None else vals[()]
+
+def make_rng(seed=None, rng=None, bit_generator=None):
+    '''
+    Returns the `numpy.random.Generator` described by the arguments,
+    or None (i.e. the global `numpy.random` state) if none of them is given.
+    '''
+    if rng is not None:
+        if seed is not None or bit_generator is not None:
+            raise TypeError('argument `rng` can not be combined with `seed` or `bit_generator`')
+        if not isinstance(rng, np.random.Generator):
+            raise TypeError('argument `rng` must be a numpy.random.Generator')
+        return rng
+    if seed is None and bit_generator is None:
+        return None
+    bit_generator = bit_generator or 'PCG64'
+    if isinstance(bit_generator, str):
+        if bit_generator not in bit_generators or not hasattr(np.random, bit_generator):
+            raise ValueError('unknown bit generator `' + bit_generator + '`, expected one of ' + ', '.join(bit_generators))
+        bit_generator = getattr(np.random, bit_generator)
+    return np.random.Generator(bit_generator(seed))
+
+@lru_cache(maxsize=64)
+def dist_caller(dist):
+    '''
+    Adapts `dist` to be called as `dist(dtype, params, shape, type_limits, rng, out)`,
+    dropping the arguments that it does not accept (`rng` and `out` are passed as keywords).
+    '''
+    import inspect
+    try:
+        parameters = inspect.signature(dist).parameters.values()
+    except (TypeError, ValueError):
+        parameters = [inspect.Parameter('kwargs', inspect.Parameter.VAR_KEYWORD)]
+    kinds = [p.kind for p in parameters]
+    keywords = tuple(
+        name for name in ('rng', 'out')
+        if inspect.Parameter.VAR_KEYWORD in kinds or any(p.name == name for p in parameters)
+    )
+    positional = (inspect.Parameter.POSITIONAL_ONLY, inspect.Parameter.POSITIONAL_OR_KEYWORD)
+    nargs = 4 if inspect.Parameter.VAR_POSITIONAL in kinds or sum(kind in positional for kind in kinds) >= 4 else 3
+
+    def sample(dtype, params, shape, type_limits, rng, out, **options):
+        kwargs = {'rng': rng, 'out': out}
+        return dist(*(dtype, params, shape, type_limits)[:nargs], **dict(options, **{k: kwargs[k] for k in keywords}))
+
+    return sample
+
+# the keys that mark a dict of params as the params of a single field, instead of a struct
+spec_keys = ('dist', 'limits', 'unique', 'sorted', 'permutation', 'derive')
+
+def isspec(params, dtype=None):
+    '''
+    Returns whether `params` is a dict of field params, e.g. `{'dist': 'normal', 'scale': 3, 'limits': (0, 10)}`,
+    rather than a dict mapping the field names of the struct `dtype` to their params.
+    '''
+    if not isinstance(params, dict) or not any(key in params for key in spec_keys):
+        return False
+    names = dtype.names if dtype is not None and dtype.names else ()
+    return not any(key in names for key in params)
 
 def isstruct(dtype):
     return hasattr(dtype, 'names') and dtype.names
@@ -42,6 +354,9 @@ def maybe_dict_get(maybe_dict, key):
     except AttributeError:
         return maybe_dict
 
+def iscarray(arr):
+    return arr.flags.c_contiguous and arr.flags.writeable and arr.flags.aligned and arr.dtype.isnative
+
 def to_tuple(shape):
     try:
         return tuple(shape)
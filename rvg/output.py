@@ -0,0 +1,176 @@
+import os
+import numpy as np
+
+formats = ('npy', 'raw', 'npz', 'text', 'csv', 'jsonl')
+text_formats = ('text', 'csv', 'jsonl')
+
+extensions = {
+    '.npy': 'npy',
+    '.npz': 'npz',
+    '.txt': 'text',
+    '.csv': 'csv',
+    '.jsonl': 'jsonl'
+}
+
+def guess_format(path):
+    '''
+    Returns the output format implied by the extension of `path` (`raw` if it is unknown).
+    '''
+    return extensions.get(os.path.splitext(path)[1].lower(), 'raw')
+
+def write_output(path, fmt, dtype, samples, fill, chunk=1 << 20, delimiter=',', precision=None):
+    '''
+    Writes `samples` values of `dtype` (a single one if `samples` is None) to the file `path`
+    in format `fmt`, one of `formats`. The values are produced by `fill(out)`, which must fill
+    the array `out` in place; it is called on chunks of at most `chunk` values,
+    so that memory usage stays bounded no matter how many samples are written.
+    `delimiter` and `precision` only apply to text formats (see `format_text`).
+    '''
+    if fmt not in formats:
+        raise ValueError('unknown output format `' + str(fmt) + '`, expected one of ' + ', '.join(formats))
+
+    if fmt in text_formats:
+        with open(path, 'wb') as f:
+            write_text(f, fmt, dtype, samples, fill, chunk, delimiter, precision)
+        return
+
+    dtype, shape = layout(dtype, samples)
+
+    if fmt == 'npy':
+        write_npy(path, dtype, shape, samples, fill, chunk)
+        return
+
+    if fmt == 'npz':
+        import tempfile
+        import zipfile
+        # `ZipFile.open(mode='w')` requires Python 3.6, so the array is written
+        # to a temporary .npy file next to `path` first, then stored in the archive
+        fd, tmp = tempfile.mkstemp(prefix='.rvg-', suffix='.npy', dir=os.path.dirname(os.path.abspath(path)))
+        os.close(fd)
+        try:
+            write_npy(tmp, dtype, shape, samples, fill, chunk)
+            with zipfile.ZipFile(path, mode='w', compression=zipfile.ZIP_STORED, allowZip64=True) as archive:
+                archive.write(tmp, 'arr_0.npy')
+        finally:
+            os.remove(tmp)
+        return
+
+    buffer = np.empty(chunk_shape(shape, samples, chunk), dtype=dtype)
+    with open(path, 'wb') as f:
+        for rows in chunks(buffer, samples, chunk):
+            fill(rows)
+            rows.tofile(f)
+
+def write_npy(path, dtype, shape, samples, fill, chunk):
+    out = np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=shape)
+    for rows in chunks(out, samples, chunk):
+        fill(rows)
+        out.flush()
+    del out
+
+def write_text(f, fmt, dtype, samples, fill, chunk=1 << 20, delimiter=',', precision=None):
+    '''
+    Writes `samples` values of `dtype` (a single one if `samples` is None) as lines of text
+    in format `fmt`, one of `text_formats`, to the binary file object `f` (e.g. `sys.stdout.buffer`).
+    The rest of the arguments are the ones of `write_output`.
+    '''
+    dtype, shape = layout(dtype, samples)
+    buffer = np.empty(chunk_shape(shape, samples, chunk), dtype=dtype)
+    for rows in chunks(buffer, samples, chunk):
+        fill(rows)
+        if samples is None:
+            rows = rows[np.newaxis]
+        f.write(format_text(rows, fmt, delimiter, precision).encode())
+
+def format_text(rows, fmt='text', delimiter=',', precision=None):
+    '''
+    Formats each row of `rows` as a line of text and returns them as a single string.
+        text:  the printed value of each row (if `precision` is given, scalar floats
+               are printed with `precision` decimal digits instead)
+        csv:   the scalar fields of each row (struct fields and subarray items alike),
+               separated by `delimiter`
+        jsonl: one JSON value per row, with structs as objects and subarrays as lists
+    Rows of scalar types are formatted a whole column at a time by `numpy`.
+    '''
+    if fmt not in text_formats:
+        raise ValueError('unknown text format `' + str(fmt) + '`, expected one of ' + ', '.join(text_formats))
+    if not len(rows):
+        return ''
+    if fmt == 'jsonl':
+        import json
+        lines = map(json.dumps, json_values(rows))
+    elif fmt == 'csv' or (rows.ndim == 1 and not rows.dtype.names):
+        lines = map(delimiter.join, zip(*(format_values(column, precision) for column in columns(rows))))
+    else:
+        lines = map(str, rows)
+    return '\n'.join(lines) + '\n'
+
+def format_values(values, precision=None):
+    '''
+    Returns the printed value of each item of the 1-dimensional, scalar array `values`.
+    '''
+    if precision is not None and values.dtype.kind == 'f':
+        return list(map(('%.' + str(precision) + 'f').__mod__, values.astype(np.float64).tolist()))
+    if values.dtype.kind == 'm':
+        # as counts of the unit of the type, like numpy prints them inside structs
+        values = values.astype(np.int64)
+    if values.dtype.kind in 'biu':
+        return list(map(str, values.tolist()))
+    return values.astype(str).tolist()
+
+def columns(rows):
+    '''
+    Yields the scalar columns of `rows`, i.e. each scalar field of each row, in memory order.
+    '''
+    if rows.dtype.names:
+        for name in rows.dtype.names:
+            for column in columns(rows[name]):
+                yield column
+    else:
+        flat = rows.reshape(len(rows), -1)
+        for i in range(flat.shape[1]):
+            yield flat[:, i]
+
+def json_values(rows):
+    '''
+    Returns the JSON-serializable value of each row of `rows`.
+    '''
+    if rows.dtype.names:
+        fields = [json_values(rows[name]) for name in rows.dtype.names]
+        return [dict(zip(rows.dtype.names, values)) for values in zip(*fields)]
+    if rows.dtype.kind == 'f' and rows.dtype.itemsize > 8:
+        rows = rows.astype(np.float64)
+    elif rows.dtype.kind == 'c':
+        # as [real, imaginary] pairs
+        rows = np.stack((rows.real, rows.imag), axis=-1).astype(np.float64)
+    elif rows.dtype.kind in 'SM':
+        # as (ISO 8601, for dates) strings
+        rows = rows.astype(str)
+    elif rows.dtype.kind == 'm':
+        # as counts of the unit of the type
+        rows = rows.astype(np.int64)
+    return rows.tolist()
+
+def layout(dtype, samples):
+    '''
+    Returns the base dtype and the full shape of `samples` values of `dtype`.
+    '''
+    # let numpy expand subarray dtypes into (base dtype, trailing shape)
+    probe = np.empty((0,), dtype=dtype)
+    return probe.dtype, (() if samples is None else (samples,)) + probe.shape[1:]
+
+def chunk_shape(shape, samples, chunk):
+    return shape if samples is None else (min(samples, chunk),) + shape[1:]
+
+def chunks(arr, samples, chunk):
+    '''
+    Yields consecutive slices of at most `chunk` rows covering `samples` rows of `arr`
+    (`arr` itself if `samples` is None). If `arr` is shorter than `samples` rows,
+    its leading rows are reused for every slice instead.
+    '''
+    if samples is None:
+        yield arr
+        return
+    for start in range(0, samples, chunk):
+        size = min(chunk, samples - start)
+        yield arr[start:start + size] if len(arr) == samples else arr[:size]
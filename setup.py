@@ -1,8 +1,12 @@
 from setuptools import setup
 
+# the version is read without importing rvg (and therefore numpy)
+about = {}
+exec(open('rvg/version.py', 'r').read(), about)
+
 setup(
     name='rvg',
-    version='0.1.11',
+    version=about['__version__'],
     description='random values generator',
     long_description=open('README.md', 'r').read(),
     long_description_content_type='text/markdown',
@@ -25,7 +29,12 @@ setup(
         'Topic :: Utilities'
     ],
 
-    install_requires=['numpy'],
+    install_requires=['numpy>=1.17'],
+    extras_require={
+        'arrow': ['pyarrow'],
+        'pandas': ['pandas'],
+        'sparse': ['scipy']
+    },
     python_requires='>=3.5',
     packages=['rvg', 'rvg.numpyrvg'],
 
@@ -0,0 +1,106 @@
+from rvg import NumPyRVG
+import asyncio
+import numpy as np
+import pytest
+
+knode = np.dtype([
+    ('num_keys', np.int32),
+    ('keys', np.float32, 3),
+    ('is_leaf', np.bool_)
+])
+
+knode_params = {'num_keys': (0, 10), 'keys': 1., 'is_leaf': {'p': 0.5}}
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+async def collect(batches, copy=True):
+    vals = []
+    async for batch in batches:
+        vals.append(batch.copy() if copy else batch)
+    return vals
+
+def test_agenerate():
+    batches = run(collect(NumPyRVG(dtype=knode, seed=1).agenerate(knode, knode_params, 300, total=1000)))
+    assert [len(batch) for batch in batches] == [300, 300, 300, 100]
+    expected = list(NumPyRVG(dtype=knode, seed=1).stream(knode, knode_params, 1000, 300))
+    assert all((a == b).all() for a, b in zip(batches, expected))
+
+def test_agenerate_ring_buffers():
+    rand = NumPyRVG(dtype=knode, seed=2)
+    batches = run(collect(rand.agenerate(knode, knode_params, 100, total=1000, prefetch=2), copy=False))
+    assert len(batches) == 10
+    assert len(set(batch.ctypes.data for batch in batches)) == 3
+    batches = run(collect(rand.agenerate(knode, knode_params, 100, total=1000, reuse=False), copy=False))
+    assert len(set(batch.ctypes.data for batch in batches)) == 10
+
+class CountingRVG(NumPyRVG):
+    generated = 0
+
+    def random(self, *args, **kwargs):
+        type(self).generated += 1
+        return super().random(*args, **kwargs)
+
+def test_agenerate_backpressure():
+    rand = CountingRVG(dtype=knode, seed=3)
+
+    async def consume():
+        batches = rand.agenerate(knode, knode_params, 10, prefetch=3)
+        for consumed in range(1, 6):
+            await batches.__anext__()
+            await asyncio.sleep(0.05)
+            assert CountingRVG.generated <= consumed + 3
+        await batches.aclose()
+        with pytest.raises(StopAsyncIteration):
+            await batches.__anext__()
+    run(consume())
+    assert CountingRVG.generated <= 8
+
+def test_agenerate_cancel():
+    rand = NumPyRVG(dtype=knode, seed=4)
+
+    async def consume(batches):
+        async for batch in batches:
+            await asyncio.sleep(10)
+
+    async def cancel():
+        async with rand.agenerate(knode, knode_params, 10) as batches:
+            task = asyncio.ensure_future(consume(batches))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+        return batches
+    batches = run(cancel())
+    assert not batches._pending and batches._executor is None
+
+def test_agenerate_does_not_block():
+    ticks = []
+
+    async def tick():
+        while True:
+            ticks.append(None)
+            await asyncio.sleep(0)
+
+    async def consume():
+        ticker = asyncio.ensure_future(tick())
+        total = 0
+        async for batch in NumPyRVG(dtype=knode, seed=5).agenerate(knode, knode_params, 1 << 17, total=1 << 19):
+            total += len(batch)
+        ticker.cancel()
+        return total
+    assert run(consume()) == 1 << 19
+    assert len(ticks) > 4
+
+def test_agenerate_errors():
+    rand = NumPyRVG(dtype=knode)
+    with pytest.raises(ValueError):
+        rand.agenerate(knode, knode_params, 0)
+    with pytest.raises(ValueError):
+        rand.agenerate(knode, knode_params, 10, prefetch=0)
+    with pytest.raises(ValueError):
+        rand.agenerate(knode, knode_params, 10, total=-1)
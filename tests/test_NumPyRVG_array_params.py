@@ -0,0 +1,81 @@
+from rvg import NumPyRVG
+import numpy as np
+import pytest
+
+n = 1000
+upper = np.arange(1, n + 1)
+
+knode = np.dtype([
+    ('num_keys', np.int32),
+    ('keys', np.float32, 3),
+    ('time', 'M8[s]'),
+    ('score', np.int64)
+])
+
+knode_params = {
+    'num_keys': (0, upper),
+    'keys': ([0, 10, 100], [1, 11, 101]),
+    'time': (np.zeros(n, dtype=np.int64), upper),
+    'score': {'dist': 'normal', 'scale': 100, 'limits': upper}
+}
+
+def check_knode(vals):
+    assert ((vals['num_keys'] >= 0) & (vals['num_keys'] < upper)).all()
+    for column, low in enumerate([0, 10, 100]):
+        assert ((vals['keys'][:, column] >= low) & (vals['keys'][:, column] <= low + 1)).all()
+    times = vals['time'].astype(np.int64)
+    assert ((times >= 0) & (times < upper)).all()
+    assert (np.abs(vals['score']) <= upper).all()
+
+@pytest.mark.parametrize('seed', [None, 1])
+def test_array_params(seed):
+    check_knode(NumPyRVG(dtype=knode, seed=seed)(knode_params, n))
+
+def test_array_params_workers():
+    rand = NumPyRVG(dtype=knode, seed=2)
+    rand.chunk_size = 300
+    vals = rand(knode_params, n, workers=3)
+    check_knode(vals)
+
+    rand = NumPyRVG(dtype=knode, seed=2)
+    rand.chunk_size = 300
+    assert (rand(knode_params, n, workers=1) == vals).all()
+
+def test_array_params_per_row_subarray():
+    rand = NumPyRVG(dtype=np.dtype((np.uint16, 4)), seed=3)
+    vals = rand((upper[:, np.newaxis], upper[:, np.newaxis] + 10), n)
+    assert ((vals >= upper[:, np.newaxis]) & (vals < upper[:, np.newaxis] + 10)).all()
+
+def test_array_limit():
+    limit = np.array([1., 1e3, 1e6])
+    vals = NumPyRVG(dtype=np.float64, seed=4)(limit, (100, 3))
+    assert (np.abs(vals) <= limit).all()
+    assert (np.abs(vals[:, 2]) > 1e3).any()
+
+def test_array_limits_argument():
+    vals = NumPyRVG(limits=(0, np.array([10, 20, 30])), seed=5)(np.int8, (100, 3))
+    assert ((vals >= 0) & (vals < [10, 20, 30])).all()
+    with pytest.raises(ValueError):
+        NumPyRVG(limits=(np.array([0, 5]), np.array([1, 5])))
+
+def test_array_params_modes():
+    with pytest.raises(ValueError):
+        NumPyRVG(dtype=np.int32)({'limits': (0, upper), 'unique': True}, n)
+
+def test_list_limits_sibling_fields():
+    dtype = np.dtype([('a', np.int32), ('b', np.int32)])
+    vals = NumPyRVG(dtype=dtype, seed=1)({'a': (0, [1, 2, 3, 4, 5]), 'b': (0, [1, 2, 3, 4, 5])}, 5)
+    assert ((vals['a'] < [1, 2, 3, 4, 5]) & (vals['b'] < [1, 2, 3, 4, 5])).all()
+    vals = NumPyRVG(dtype=dtype, seed=1)({'a': (0, [1, 1000]), 'b': (0, [1, 1000])}, 2)
+    assert vals['a'][0] == 0 and vals['b'][0] == 0
+    plan = NumPyRVG(dtype=dtype).compile(dtype, {'a': (0, [1, 1000]), 'b': (0, [1, 1000])})
+    assert len(plan.groups) == 2
+
+@pytest.mark.parametrize('seed', [None, 1])
+def test_array_limits_64_bits(seed):
+    vals = NumPyRVG(dtype=np.uint64, seed=seed)((0, [1, 2, 3, 4]), (100, 4))
+    assert vals.dtype == np.uint64 and (vals < [1, 2, 3, 4]).all()
+    vals = NumPyRVG(dtype=np.uint64, seed=seed)(([-5, 2 ** 63], 2 ** 64), (100, 2))
+    assert (vals[:, 1] >= 2 ** 63).all()
+    vals = NumPyRVG(dtype=np.int64, seed=seed)(([-2 ** 70, 0], [0, 2 ** 70]), (100, 2))
+    assert (vals[:, 0] < 0).all() and (vals[:, 1] >= 0).all()
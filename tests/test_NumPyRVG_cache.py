@@ -0,0 +1,119 @@
+from rvg import NumPyRVG
+from rvg.numpyrvg.cache import DiskCache, key
+import numpy as np
+import os
+import pytest
+
+knode = np.dtype([
+    ('location', np.int32),
+    ('keys', np.int32, 3),
+    ('is_leaf', np.bool_),
+    ('num_keys', np.int32)
+])
+
+knode_params = {
+    'location': 1000,
+    'keys': {'dist': 'normal', 'scale': 10, 'limits': 100},
+    'is_leaf': {'p': 0.5},
+    'num_keys': {'limits': (0, np.arange(1, 1001))}
+}
+
+def npy_files(directory):
+    return sorted(name for name in os.listdir(str(directory)) if name.endswith('.npy') and not name.startswith('.'))
+
+class CountingCache(DiskCache):
+    stored = 0
+
+    def storing(self, *args):
+        self.stored += 1
+        return DiskCache.storing(self, *args)
+
+def generated(rand, cache, seed):
+    stored = cache.stored
+    rand(np.int64, 100, seed=seed, cache=cache)
+    return cache.stored > stored
+
+def test_cache_hit(tmp_path):
+    rand = NumPyRVG(dtype=knode)
+    # the values are generated straight into the file of the cache
+    vals = rand(knode_params, 1000, seed=1, cache=tmp_path)
+    assert isinstance(vals, np.memmap) and not vals.flags.writeable and len(npy_files(tmp_path)) == 1
+
+    cached = rand(knode_params, 1000, seed=1, cache=tmp_path)
+    assert isinstance(cached, np.memmap) and not cached.flags.writeable
+    assert (cached == vals).all()
+    assert (cached == rand(knode_params, 1000, seed=1)).all()
+
+    out = np.empty(1000, dtype=knode)
+    assert rand(knode_params, 1000, seed=1, cache=tmp_path, out=out) is out
+    assert (out == vals).all()
+
+def test_cache_keys(tmp_path):
+    rand = NumPyRVG(dtype=knode)
+    rand(knode_params, 1000, seed=1, cache=tmp_path)
+    rand(knode_params, 1000, seed=2, cache=tmp_path)
+    rand(knode_params, 1000, seed=1, start=10, stop=20, cache=tmp_path)
+    rand(dict(knode_params, location=999), 1000, seed=1, cache=tmp_path)
+    rand(dict(knode_params, num_keys={'limits': (0, np.arange(2, 1002))}), 1000, seed=1, cache=tmp_path)
+    rand(knode_params, 1000, seed=1, cache=tmp_path, workers=2)
+    assert len(npy_files(tmp_path)) == 5
+
+    assert key(knode, {'a': 1, 'b': 2}) == key(knode, {'b': 2, 'a': 1})
+    assert key(knode, (1, 2)) != key(knode, [1, 2]) != key(knode, (1., 2.))
+    with pytest.raises(ValueError):
+        key(lambda x: x)
+
+def test_cache_eviction(tmp_path):
+    rand = NumPyRVG(limits=(0, 100))
+    cache = CountingCache(tmp_path, max_bytes=2500)
+    for seed in range(3):
+        assert generated(rand, cache, seed)
+    # each array takes 800 bytes plus its header, so only the last 2 fit
+    assert len(npy_files(tmp_path)) == 2
+    for name in npy_files(tmp_path):
+        os.utime(os.path.join(str(tmp_path), name), (0, 0))
+    # a hit makes seed 1 the most recently used one, so seed 2 is evicted next
+    assert not generated(rand, cache, 1)
+    assert generated(rand, cache, 3)
+    assert len(npy_files(tmp_path)) == 2
+    assert not generated(rand, cache, 1)
+    assert generated(rand, cache, 2)
+
+def test_cache_errors(tmp_path):
+    rand = NumPyRVG(dtype=knode)
+    with pytest.raises(ValueError):
+        rand(knode_params, 10, cache=tmp_path)
+    with pytest.raises(ValueError):
+        rand(knode_params, 10, seed=1, cache=tmp_path, dist=lambda *args, **kwargs: 0)
+    with pytest.raises(ValueError):
+        DiskCache(tmp_path, max_bytes=0)
+
+def test_cache_read_only(tmp_path, monkeypatch):
+    rand = NumPyRVG(dtype=knode)
+    vals = rand(knode_params, 1000, seed=1, cache=tmp_path)
+
+    def utime(*args):
+        raise PermissionError('read-only')
+    monkeypatch.setattr(os, 'utime', utime)
+    cached = rand(knode_params, 1000, seed=1, cache=tmp_path)
+    assert isinstance(cached, np.memmap) and (cached == vals).all()
+
+def test_cache_numpy_version(tmp_path, monkeypatch):
+    rand = NumPyRVG(limits=(0, 100))
+    cache = CountingCache(tmp_path)
+    assert generated(rand, cache, 1)
+    monkeypatch.setattr(np, '__version__', np.__version__ + '.post1')
+    # values drawn by another version of numpy may differ, so they are not reused
+    assert generated(rand, cache, 1)
+    assert len(npy_files(tmp_path)) == 2
+
+def test_cache_storing(tmp_path):
+    cache = DiskCache(tmp_path)
+    with cache.storing('a', np.dtype(np.int32), (10, 2)) as out:
+        out[...] = np.arange(20).reshape(10, 2)
+        assert not npy_files(tmp_path)
+    assert (cache.load('a') == np.arange(20).reshape(10, 2)).all()
+    with pytest.raises(KeyboardInterrupt):
+        with cache.storing('b', np.dtype(np.int32), (10,)):
+            raise KeyboardInterrupt
+    assert cache.load('b') is None and os.listdir(str(tmp_path)) == ['a.npy']
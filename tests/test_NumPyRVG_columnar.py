@@ -0,0 +1,87 @@
+from rvg import NumPyRVG
+import numpy as np
+import pytest
+
+record = np.dtype([
+    ('i', np.int32),
+    ('a', [('x', np.int16), ('y', np.complex64)], 3),
+    ('k', np.uint8, (2, 2)),
+    ('t', 'M8[ms]'),
+    ('s', 'U4'),
+    ('b', np.bool_)
+])
+
+record_params = {
+    'i': 10,
+    'a': {'x': (0, 5), 'y': (1, 2)},
+    'k': {'limits': (0, 4), 'permutation': True},
+    't': (0, 1000),
+    's': {'length': 4},
+    'b': {'p': 0.5}
+}
+
+def test_columns():
+    columns = NumPyRVG(dtype=record, seed=1)(record_params, 100, layout='columnar')
+
+    assert list(columns) == ['i', 'a.x', 'a.y', 'k', 't', 's', 'b']
+    assert columns.shape == (100,)
+    for name, dtype, shape in [
+        ('i', np.int32, (100,)),
+        ('a.x', np.int16, (100, 3)),
+        ('a.y', np.complex64, (100, 3)),
+        ('k', np.uint8, (100, 2, 2)),
+        ('s', np.dtype('U4'), (100,))
+    ]:
+        assert columns[name].dtype == dtype and columns[name].shape == shape
+        assert columns[name].flags.c_contiguous
+    assert ((columns['i'] >= -10) & (columns['i'] <= 10)).all()
+    assert ((columns['a.x'] >= 0) & (columns['a.x'] <= 5)).all()
+    assert (np.sort(columns['k'].reshape(100, 4), axis=1) == np.arange(4)).all()
+
+def test_columns_workers():
+    rand = NumPyRVG(dtype=record, seed=2)
+    rand.chunk_size = 30
+    columns1 = rand(record_params, 100, layout='columnar', workers=1)
+    rand = NumPyRVG(dtype=record, seed=2)
+    rand.chunk_size = 30
+    columns2 = rand(record_params, 100, layout='columnar', workers=3)
+    assert all((columns1[name] == columns2[name]).all() for name in columns1)
+
+def test_columns_scalar_dtype():
+    columns = NumPyRVG(limit=3, seed=3)(np.int8, (2, 3), layout='columnar')
+    assert list(columns) == ['value'] and columns['value'].shape == (2, 3)
+    assert NumPyRVG(limit=3)(np.int8, layout='columnar')['value'].shape == ()
+
+def test_columns_errors():
+    rand = NumPyRVG(limit=3)
+    with pytest.raises(ValueError):
+        rand(np.int8, 10, layout='rows')
+    with pytest.raises(ValueError):
+        rand(np.int8, 10, layout='columnar', out=np.empty(10, np.int8))
+
+def test_to_arrow():
+    pa = pytest.importorskip('pyarrow')
+    columns = NumPyRVG(dtype=record, seed=4)(record_params, 100, layout='columnar')
+    table = columns.to_arrow()
+
+    assert table.num_rows == 100
+    assert table.schema.field('i').type == pa.int32()
+    assert table.schema.field('a.x').type == pa.list_(pa.int16(), 3)
+    assert table.schema.field('a.y').type == pa.list_(pa.list_(pa.float32(), 2), 3)
+    assert table.schema.field('k').type == pa.list_(pa.list_(pa.uint8(), 2), 2)
+    assert table.schema.field('t').type == pa.timestamp('ms')
+    assert table.column('a.x').to_pylist()[7] == columns['a.x'][7].tolist()
+    # numbers are shared, not copied
+    assert table.column('a.x').chunk(0).values.buffers()[1].address == columns['a.x'].ctypes.data
+    assert table.column('i').chunk(0).buffers()[1].address == columns['i'].ctypes.data
+
+def test_to_pandas():
+    pytest.importorskip('pandas')
+    columns = NumPyRVG(dtype=record, seed=5)(record_params, 100, layout='columnar')
+    df = columns.to_pandas()
+
+    assert len(df) == 100
+    assert list(df.columns)[:5] == ['i', 'a.x[0]', 'a.x[1]', 'a.x[2]', 'a.y[0]']
+    assert 'k[1][0]' in df.columns
+    assert (df['k[1][0]'].to_numpy() == columns['k'][:, 1, 0]).all()
+    assert np.shares_memory(df['i'].to_numpy(), columns['i'])
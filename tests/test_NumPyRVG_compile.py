@@ -0,0 +1,118 @@
+from rvg import NumPyRVG
+import numpy as np
+
+inner = np.dtype([
+    ('x', np.int16),
+    ('y', np.float32)
+])
+
+outer = np.dtype([
+    ('i', np.int8),
+    ('a', (inner, 3)),
+    ('k', (np.int64, (2, 2)))
+])
+
+outer_params = {
+    'i' : 10,
+    'a' : {'x' : (0, 5), 'y' : (100, 200)},
+    'k' : (-3, 3)
+}
+
+def test_plan_leaves():
+    plan = NumPyRVG(dtype=outer).compile(outer, outer_params)
+
+    assert [leaf.name for leaf in plan.leaves] == ['i', 'a.x', 'a.y', 'k']
+    assert [leaf.offset for leaf in plan.leaves] == [
+        outer.fields['i'][1],
+        outer.fields['a'][1],
+        outer.fields['a'][1] + inner.fields['y'][1],
+        outer.fields['k'][1]
+    ]
+    assert [leaf.shape for leaf in plan.leaves] == [(), (3,), (3,), (2, 2)]
+    assert plan.leaves[1].strides == (inner.itemsize,)
+    assert [leaf.params for leaf in plan.leaves] == [10, (0, 5), (100, 200), (-3, 3)]
+
+def test_plan_generation():
+    rand = NumPyRVG(dtype=outer)
+    vals = rand(outer_params, shape=50)
+
+    assert vals.dtype == outer
+    assert ((vals['i'] >= -10) & (vals['i'] <= 10)).all()
+    assert ((vals['a']['x'] >= 0) & (vals['a']['x'] <= 5)).all()
+    assert ((vals['a']['y'] >= 100) & (vals['a']['y'] <= 200)).all()
+    assert ((vals['k'] >= -3) & (vals['k'] <= 3)).all()
+
+def test_plan_cache():
+    rand = NumPyRVG(dtype=outer)
+    plan = rand.compile(outer, outer_params)
+
+    assert rand.compile(outer, dict(outer_params)) is plan
+    assert rand.compile(outer, 10) is not plan
+
+def test_plan_cache_mutated_params():
+    rand = NumPyRVG(dtype=outer)
+    params = {'i' : 10, 'a' : {'x' : (0, 5), 'y' : (100, 200)}, 'k' : (-3, 3)}
+    plan = rand.compile(outer, params)
+    assert rand.compile(outer, params) is plan
+
+    # the same dict, changed in place, is compiled again
+    params['a']['x'] = (50, 60)
+    assert rand.compile(outer, params) is not plan
+    vals = rand(params, shape=50)
+    assert ((vals['a']['x'] >= 50) & (vals['a']['x'] < 60)).all()
+
+def test_plan_cache_eviction():
+    rand = NumPyRVG(limit=10)
+    rand.plan_cache_size = 4
+    plans = [rand.compile(np.int32, (0, b)) for b in range(1, 10)]
+
+    assert len(rand._plans) == 4
+    assert rand.compile(np.int32, (0, 9)) is plans[-1]
+    assert rand.compile(np.int32, (0, 1)) is not plans[0]
+
+wide = np.dtype(
+    [('i' + str(i), np.int32) for i in range(50)] +
+    [('x', np.float64), ('s', np.int16), ('y', np.float64), ('a', (np.int32, 2))]
+)
+
+wide_params = dict(
+    [('i' + str(i), (0, 1000)) for i in range(50)] +
+    [('x', (0, 1)), ('s', 5), ('y', (0, 1)), ('a', (0, 1000))]
+)
+
+def test_plan_groups():
+    plan = NumPyRVG(dtype=wide).compile(wide, wide_params)
+
+    groups = plan.groups
+    assert len(groups) == 4
+    assert groups[0].shape == (50,) and groups[0].strides == (4,)
+    assert groups[1].name == 'x,y' and groups[1].strides == (wide.fields['y'][1] - wide.fields['x'][1],)
+    assert groups[2].name == 's'
+    assert groups[3].name == 'a' and groups[3].shape == (2,)
+
+def test_plan_groups_need_same_params():
+    params = dict(wide_params, i7=(0, 10))
+    plan = NumPyRVG(dtype=wide).compile(wide, params)
+    assert [g.name for g in plan.groups][:3] == [
+        ','.join('i' + str(i) for i in range(7)),
+        'i7',
+        ','.join('i' + str(i) for i in range(8, 50))
+    ]
+
+def test_batched_generation():
+    rand = NumPyRVG(dtype=wide, seed=1)
+    vals = rand(wide_params, shape=(100, 3))
+
+    for i in range(50):
+        field = vals['i' + str(i)]
+        assert ((field >= 0) & (field <= 1000)).all()
+    assert ((vals['x'] >= 0) & (vals['x'] <= 1)).all()
+    assert ((vals['y'] >= 0) & (vals['y'] <= 1)).all()
+    assert ((vals['s'] >= -5) & (vals['s'] <= 5)).all()
+    # all fields are drawn independently
+    assert (vals['i0'] != vals['i1']).any() and (vals['x'] != vals['y']).any()
+
+def test_batched_generation_reproducible():
+    vals1 = NumPyRVG(dtype=wide, seed=2)(wide_params, 10)
+    vals2 = NumPyRVG(dtype=wide, seed=2)(wide_params, 10)
+    assert (vals1 == vals2).all()
@@ -0,0 +1,99 @@
+from rvg import NumPyRVG
+from rvg.numpyrvg.derive import names
+import numpy as np
+import pytest
+
+knode = np.dtype([
+    ('start', np.int32),
+    ('duration', np.int32),
+    ('end', np.int32),
+    ('keys', np.int32, 3),
+    ('num_keys', np.int32),
+    ('is_leaf', np.bool_)
+])
+
+knode_params = {
+    'start': (0, 100),
+    'duration': (1, 10),
+    'end': {'derive': 'start + duration'},
+    'keys': (-5, 5),
+    'num_keys': (0, 5),
+    'is_leaf': {'derive': lambda r: (r['keys'] < 0).all(axis=-1) | (r['end'] > 100), 'depends': ['keys', 'end']}
+}
+
+def check_knode(vals):
+    assert (vals['end'] == vals['start'] + vals['duration']).all()
+    assert (vals['is_leaf'] == ((vals['keys'] < 0).all(axis=-1) | (vals['end'] > 100))).all()
+
+@pytest.mark.parametrize('seed', [None, 1])
+def test_derived_fields(seed):
+    vals = NumPyRVG(dtype=knode, seed=seed)(knode_params, 1000)
+    check_knode(vals)
+    assert vals['is_leaf'].any()
+
+def test_derived_fields_scalar():
+    val = NumPyRVG(dtype=knode, seed=2)(knode_params)
+    assert val['end'] == val['start'] + val['duration']
+
+def test_derived_fields_order():
+    params = dict(knode_params, start={'derive': 'end - duration'}, end=(0, 100))
+    vals = NumPyRVG(dtype=knode, seed=3)(params, 100)
+    check_knode(vals)
+    plan = NumPyRVG(dtype=knode).compile(knode, params)
+    assert [derived.name for derived in plan.derived] == ['start', 'is_leaf']
+    assert 'start' not in [leaf.name for leaf in plan.leaves]
+
+def test_derived_fields_cycle():
+    params = dict(knode_params, start={'derive': 'end - duration'})
+    with pytest.raises(ValueError):
+        NumPyRVG(dtype=knode)(params, 10)
+
+def test_derived_nested_field():
+    dtype = np.dtype([('a', [('x', np.int16), ('y', np.int16)], 2), ('b', np.int16)])
+    params = {'a': {'x': (0, 10), 'y': {'derive': lambda r: 2 * r['a']['x']}}, 'b': 3}
+    vals = NumPyRVG(dtype=dtype, seed=4)(params, 100)
+    assert (vals['a']['y'] == 2 * vals['a']['x']).all()
+
+def test_derived_columnar():
+    columns = NumPyRVG(dtype=knode, seed=5)(knode_params, 100, layout='columnar')
+    assert list(columns) == list(knode.names)
+    assert (columns['end'] == columns['start'] + columns['duration']).all()
+
+def test_expression_names():
+    assert names('np.minimum(end, start + 1) > x') == ('end', 'start', 'x')
+
+@pytest.mark.parametrize('seed', [None, 6])
+def test_constraints(seed):
+    vals = NumPyRVG(dtype=knode, seed=seed)(
+        knode_params, 10000,
+        constraints=['num_keys <= 3', lambda r: r['end'] < 105, 'np.all(keys[:, 1:] > keys[:, :-1], axis=1)']
+    )
+    check_knode(vals)
+    assert (vals['num_keys'] <= 3).all() and (vals['end'] < 105).all()
+    assert (np.diff(vals['keys'], axis=1) > 0).all()
+
+def test_constraints_workers():
+    rand = NumPyRVG(dtype=knode, seed=7)
+    rand.chunk_size = 1000
+    vals = rand(knode_params, 5000, workers=3, constraints='end > 50')
+    assert (vals['end'] > 50).all()
+
+    rand = NumPyRVG(dtype=knode, seed=7)
+    rand.chunk_size = 1000
+    assert (rand(knode_params, 5000, workers=1, constraints='end > 50') == vals).all()
+
+def test_constraints_array_params():
+    upper = np.arange(10, 1010)
+    vals = NumPyRVG(limits=(0, upper), seed=8)(np.int32, 1000, constraints=lambda r: r % 2 == 0)
+    assert (vals % 2 == 0).all() and (vals < upper).all()
+
+def test_constraints_errors():
+    rand = NumPyRVG(dtype=knode, seed=9)
+    with pytest.raises(ValueError):
+        rand(knode_params, 10, constraints='num_keys > 10')
+    with pytest.raises(ValueError):
+        rand(knode_params, 10, constraints='num_keys > 1', layout='columnar')
+    with pytest.raises(ValueError):
+        rand(dict(knode_params, num_keys={'limits': (0, 100), 'unique': True}), 10, constraints='num_keys > 1')
+    with pytest.raises(TypeError):
+        rand(knode_params, 10, constraints=[1])
@@ -0,0 +1,124 @@
+from rvg import NumPyRVG
+from rvg.numpyrvg.dists import distributions, register
+import numpy as np
+import pytest
+
+def test_registered_dists():
+    for name in ['uniform', 'normal', 'lognormal', 'exponential', 'truncnorm', 'poisson', 'zipf']:
+        assert name in distributions
+
+@pytest.mark.parametrize('name', ['normal', 'lognormal', 'exponential', 'truncnorm', 'poisson', 'zipf'])
+@pytest.mark.parametrize('dtype', [np.int8, np.uint16, np.int64, np.float32, np.float64])
+def test_dist_limits(name, dtype):
+    rand = NumPyRVG(limits=(0, 5), seed=1)
+    vals = rand(dtype, 1000, dist=name)
+    assert vals.dtype == dtype
+    assert ((vals >= 0) & (vals <= 5)).all()
+
+@pytest.mark.parametrize('name', ['normal', 'exponential', 'poisson'])
+def test_dist_legacy_engine(name):
+    np.random.seed(0)
+    vals = NumPyRVG(limits=(0, 5))(np.float64, 1000, dist=name)
+    assert ((vals >= 0) & (vals <= 5)).all()
+
+def test_dist_scalar():
+    val = NumPyRVG(limit=10, seed=1)(np.int32, dist='normal')
+    assert isinstance(val, np.int32) and -10 <= val <= 10
+
+def test_dist_unknown():
+    with pytest.raises(ValueError):
+        NumPyRVG(limit=10)(np.int32, 10, dist='nope')
+
+def test_normal_moments():
+    rand = NumPyRVG(dtype=np.float64, seed=2)
+    vals = rand({'dist': 'normal', 'loc': 3, 'scale': 2}, 100000)
+    assert abs(vals.mean() - 3) < 0.05
+    assert abs(vals.std() - 2) < 0.05
+
+def test_truncnorm_redraws():
+    rand = NumPyRVG(dtype=np.float64, seed=3)
+    vals = rand({'dist': 'truncnorm', 'limits': (1, 2)}, 10000)
+    assert ((vals >= 1) & (vals <= 2)).all()
+    # redrawn instead of clipped, so the limits are not piled up
+    assert (vals == 1).sum() == 0 and (vals == 2).sum() == 0
+
+@pytest.mark.parametrize('spec', [
+    {'dist': 'normal', 'loc': 3, 'scale': 3},
+    {'dist': 'truncnorm', 'loc': 3, 'scale': 3},
+    {'dist': 'poisson', 'lam': 3},
+    {'dist': 'zipf'}
+])
+def test_integer_limits_half_open(spec):
+    # like uniform values, integers never reach their upper limit
+    vals = NumPyRVG(dtype=np.int8, seed=2)(dict(spec, limits=(0, 3)), 10000)
+    assert ((vals >= 0) & (vals < 3)).all()
+    assert (vals == 2).any()
+    vals = NumPyRVG(dtype=np.int8, seed=3)(dict(spec, limits=(0, [3, 5])), (1000, 2))
+    assert (vals < [3, 5]).all() and (vals[:, 1] == 4).any()
+
+def test_integer_rounding():
+    rand = NumPyRVG(dtype=np.int16, seed=4)
+    vals = rand({'dist': 'normal', 'loc': 0.4, 'scale': 0.01}, 100)
+    assert (vals == 0).all()
+
+struct = np.dtype([
+    ('id', np.uint32),
+    ('price', np.float32),
+    ('visits', np.int64),
+    ('hops', (np.int8, 4))
+])
+
+struct_params = {
+    'id': (0, 1000),
+    'price': {'dist': 'lognormal', 'mean': 1, 'sigma': 0.5, 'limits': (0, 100)},
+    'visits': {'dist': 'poisson', 'lam': 3},
+    'hops': {'dist': 'zipf', 'a': 3, 'limits': (1, 20)}
+}
+
+def test_struct_field_dists():
+    rand = NumPyRVG(dtype=struct, seed=5)
+    vals = rand(struct_params, 1000)
+
+    assert ((vals['id'] >= 0) & (vals['id'] <= 1000)).all()
+    assert ((vals['price'] > 0) & (vals['price'] <= 100)).all()
+    assert (vals['visits'] >= 0).all() and abs(vals['visits'].mean() - 3) < 0.3
+    assert ((vals['hops'] >= 1) & (vals['hops'] <= 20)).all()
+
+    plan = rand.compile(struct, struct_params)
+    assert [leaf.dist for leaf in plan.leaves] == [
+        None, distributions['lognormal'], distributions['poisson'], distributions['zipf']
+    ]
+    assert plan.leaves[1].options == {'mean': 1, 'sigma': 0.5}
+
+def test_struct_spec_for_all_fields():
+    dtype = np.dtype([('x', np.float64), ('y', np.float64)])
+    vals = NumPyRVG(dtype=dtype, seed=6)({'dist': 'exponential', 'scale': 2, 'limits': (0, 50)}, 1000)
+    assert ((vals['x'] >= 0) & (vals['y'] >= 0)).all()
+    assert (vals['x'] != vals['y']).any()
+
+def test_struct_field_dists_workers():
+    vals1 = NumPyRVG(dtype=struct, seed=7)(struct_params, 1000, workers=1)
+    vals2 = NumPyRVG(dtype=struct, seed=7)(struct_params, 1000, workers=3)
+    assert (vals1 == vals2).all()
+
+def test_register():
+    @register('constant')
+    def constant_dist(dtype, params, shape, type_limits, value=0):
+        return np.full(shape, value, dtype=dtype)
+
+    try:
+        vals = NumPyRVG(dtype=np.int32)({'dist': 'constant', 'value': 7}, 5)
+        assert (vals == 7).all()
+    finally:
+        del distributions['constant']
+
+def test_unmarked_field_dist_not_grouped():
+    # a callable that is not marked as `elementwise` may depend on the shape it is asked for
+    def counting_dist(dtype, params, shape, type_limits):
+        return np.arange(int(np.prod(shape)), dtype=dtype).reshape(shape)
+
+    dtype = np.dtype([('a', np.int32), ('b', np.int32)])
+    params = {'a': {'dist': counting_dist}, 'b': {'dist': counting_dist}}
+    expected = NumPyRVG(dtype=dtype)(params, 4)
+    assert (expected['a'] == np.arange(4)).all() and (expected['b'] == np.arange(4)).all()
+    assert (NumPyRVG(dtype=dtype, seed=8)(params, 4) == expected).all()
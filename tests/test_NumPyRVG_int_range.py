@@ -0,0 +1,60 @@
+from rvg import NumPyRVG
+from rvg.numpyrvg.utils import int_limits
+import numpy as np
+import pytest
+
+int_types = [np.int8, np.uint8, np.int16, np.uint16, np.int32, np.uint32, np.int64, np.uint64]
+
+@pytest.mark.parametrize('t', int_types)
+def test_full_range_limits(t):
+    info = np.iinfo(t)
+    assert int_limits(np.dtype(t), (-2**70, 2**70), True) == (int(info.min), int(info.max) + 1)
+    assert int_limits(np.dtype(t), 2**70, True) == (int(info.min), int(info.max) + 1)
+
+@pytest.mark.parametrize('bit_generator', [None, 'PCG64', 'MT19937', 'Philox'])
+@pytest.mark.parametrize('t', [np.int8, np.uint8, np.int16])
+def test_full_range_values(t, bit_generator):
+    seed = None if bit_generator is None else 1
+    vals = NumPyRVG(limits=(-2**70, 2**70), seed=seed, bit_generator=bit_generator)(t, 1 << 20)
+    assert vals.dtype == t
+    info = np.iinfo(t)
+    assert vals.min() == info.min and vals.max() == info.max
+    counts = np.bincount((vals.astype(np.int64) - info.min).ravel(), minlength=int(info.max) - int(info.min) + 1)
+    assert (counts > 0).all()
+    if t != np.int16:
+        assert counts.max() < 1.2 * counts.mean()
+
+@pytest.mark.parametrize('seed', [None, 2])
+def test_full_range_64_bits(seed):
+    for t in [np.int64, np.uint64]:
+        vals = NumPyRVG(limits=(-2**64, 2**64), seed=seed)(t, 10000)
+        assert vals.dtype == t
+        assert (vals < 0).any() if t == np.int64 else (vals >= 2**63).any()
+    assert isinstance(NumPyRVG(limits=(0, 2**64), seed=seed)(np.uint16), np.uint16)
+
+def test_float_limits():
+    vals = NumPyRVG(limits=(0.5, 2.5), seed=3)(np.int32, 1000)
+    assert set(vals.tolist()) == {1, 2}
+    vals = NumPyRVG(limits=(1e10, 1e100), seed=3)(np.int64, 1000)
+    assert (vals >= 10**10).all()
+    with pytest.raises(ValueError):
+        NumPyRVG(limits=(1e10, 1e100))(np.int32)
+    with pytest.warns(Warning):
+        rand = NumPyRVG(limits=(-10, -5))
+    with pytest.raises(ValueError):
+        rand(np.uint8)
+
+def test_full_range_modes():
+    vals = NumPyRVG(limits=(0, 2**64), seed=4)(np.uint64, 1000, unique=True)
+    assert len(np.unique(vals)) == 1000
+    vals = NumPyRVG(limits=(-2**64, 2**64), seed=4)(np.int8, 256, permutation=True)
+    assert (np.sort(vals) == np.arange(-128, 128)).all()
+
+@pytest.mark.parametrize('seed', [None, 1])
+def test_array_limits_full_range(seed):
+    # array limits beyond the range of the type are clipped to [min, max + 1) as well
+    for dtype in [np.int8, np.uint8, np.int64, np.uint64]:
+        info = np.iinfo(dtype)
+        low = np.array([info.max - 1, info.min], dtype=dtype)
+        vals = NumPyRVG(dtype=dtype, seed=seed)((low, [2 ** 80, int(info.min) + 1]), (1000, 2))
+        assert (vals[:, 0] == info.max).any() and (vals[:, 1] == info.min).all()
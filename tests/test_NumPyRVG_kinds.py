@@ -0,0 +1,79 @@
+from rvg import NumPyRVG
+from rvg.output import format_text
+import numpy as np
+import pytest
+
+record = np.dtype([
+    ('ok', np.bool_),
+    ('z', np.complex64),
+    ('t', 'M8[ns]'),
+    ('d', 'm8[ms]'),
+    ('id', 'S8'),
+    ('name', 'U6'),
+    ('x', np.int16)
+])
+
+record_params = {
+    'ok': {'p': 0.9},
+    'z': (0, 1),
+    't': ('2020-01-01', '2021-01-01'),
+    'd': (0, 1000),
+    'id': {'alphabet': '0123456789ABCDEF'},
+    'name': {'alphabet': 'αβγδ', 'length': (2, 6)},
+    'x': 10
+}
+
+@pytest.mark.parametrize('seed', [None, 1])
+def test_struct_kinds(seed):
+    vals = NumPyRVG(dtype=record, seed=seed)(record_params, 10000)
+
+    assert vals.dtype == record
+    assert 0.85 < vals['ok'].mean() < 0.95
+    assert ((vals['z'].real >= 0) & (vals['z'].real <= 1)).all()
+    assert ((vals['z'].imag >= 0) & (vals['z'].imag <= 1)).all()
+    assert (vals['z'].real != vals['z'].imag).any()
+    assert (vals['t'] >= np.datetime64('2020-01-01')).all() and (vals['t'] < np.datetime64('2021-01-01')).all()
+    assert ((vals['d'] >= np.timedelta64(0, 'ms')) & (vals['d'] < np.timedelta64(1000, 'ms'))).all()
+    assert all(len(v) == 8 and set(v) <= set(b'0123456789ABCDEF') for v in vals['id'][:100])
+    assert all(2 <= len(v) <= 6 and set(v) <= set('αβγδ') for v in vals['name'][:100])
+    assert ((vals['x'] >= -10) & (vals['x'] <= 10)).all()
+
+def test_struct_kinds_scalar():
+    val = NumPyRVG(dtype=record, seed=2)(record_params)
+    assert isinstance(val, np.void) and val.dtype == record
+
+@pytest.mark.parametrize('dtype', ['?', 'c8', 'c16', 'M8[D]', '>M8[s]', 'm8[us]', 'S3', 'U3', '>U3'])
+def test_kinds(dtype):
+    rand = NumPyRVG(limits=(0, 10), seed=3)
+    vals = rand(dtype, 100)
+    assert vals.dtype == np.dtype(dtype)
+    assert isinstance(rand(dtype), np.generic)
+    if vals.dtype.kind in 'mM':
+        assert ((vals.astype(np.int64) >= 0) & (vals.astype(np.int64) < 10)).all()
+
+def test_datetime_limits():
+    rand = NumPyRVG(limits=('2000-01-01', '2000-01-03'), seed=4)
+    vals = rand('M8[h]', 1000)
+    assert ((vals >= np.datetime64('2000-01-01T00')) & (vals < np.datetime64('2000-01-03T00'))).all()
+
+def test_timedelta_limits():
+    rand = NumPyRVG(limits=(np.timedelta64(1, 'h'), np.timedelta64(2, 'h')), seed=5)
+    vals = rand('m8[s]', 1000)
+    assert ((vals >= np.timedelta64(3600, 's')) & (vals < np.timedelta64(7200, 's'))).all()
+
+def test_generic_datetime():
+    with pytest.raises(NotImplementedError):
+        NumPyRVG(limits=(0, 10))('M8', 10)
+
+def test_string_length():
+    vals = NumPyRVG(dtype='S10', seed=6)({'length': 4}, 100)
+    assert all(len(v) == 4 for v in vals)
+    with pytest.raises(ValueError):
+        NumPyRVG(dtype='S10')({'length': (2, 11)}, 100)
+    with pytest.raises(ValueError):
+        NumPyRVG(dtype='U10')({'alphabet': ''}, 100)
+
+def test_kinds_jsonl():
+    vals = NumPyRVG(dtype=record, seed=7)(record_params, 3)
+    lines = format_text(vals, 'jsonl').splitlines()
+    assert len(lines) == 3 and '"t": "2020-' in lines[0]
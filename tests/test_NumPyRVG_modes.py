@@ -0,0 +1,98 @@
+from rvg import NumPyRVG
+from rvg.numpyrvg.modes import feistel, floyd_rows
+import numpy as np
+import pytest
+
+@pytest.mark.parametrize('seed', [None, 1])
+def test_unique(seed):
+    vals = NumPyRVG(limits=(0, 2000), seed=seed)(np.int32, 1000, unique=True)
+    assert len(np.unique(vals)) == 1000
+    assert ((vals >= 0) & (vals < 2000)).all()
+    assert (np.diff(vals) < 0).any()
+
+def test_unique_huge_range():
+    vals = NumPyRVG(limits=(0, 2 ** 64), seed=2)(np.uint64, 100000, unique=True)
+    assert len(np.unique(vals)) == 100000
+    # values are spread over the whole range
+    assert vals.max() > 2 ** 63
+
+def test_unique_sorted():
+    vals = NumPyRVG(limits=(-10 ** 9, 10 ** 9), seed=3)(np.int64, 10000, unique=True, sorted=True)
+    assert (np.diff(vals) > 0).all()
+
+def test_unique_full_range():
+    vals = NumPyRVG(limits=(-5, 5), seed=4)(np.int8, 10, unique=True, sorted=True)
+    assert (vals == np.arange(-5, 5)).all()
+
+def test_unique_too_many():
+    with pytest.raises(ValueError):
+        NumPyRVG(limits=(0, 5), seed=5)(np.int8, 10, unique=True)
+
+def test_unique_floats():
+    vals = NumPyRVG(limits=(0, 1), seed=6)(np.float16, 500, unique=True)
+    assert len(np.unique(vals)) == 500
+
+def test_unique_dist():
+    vals = NumPyRVG(dtype=np.int32, seed=7)({'dist': 'poisson', 'lam': 50, 'unique': True}, 10)
+    assert len(np.unique(vals)) == 10
+
+def test_permutation():
+    vals = NumPyRVG(limits=(10, 10 ** 6), seed=8)(np.uint32, 1000, permutation=True)
+    assert (np.sort(vals) == np.arange(10, 1010)).all()
+    assert (vals != np.arange(10, 1010)).any()
+
+def test_permutation_floats():
+    with pytest.raises(TypeError):
+        NumPyRVG(limits=(0, 10), seed=9)(np.float32, 5, permutation=True)
+
+knode = np.dtype([
+    ('location', np.int32),
+    ('keys', np.int32, 8),
+    ('order', np.uint8, (2, 3)),
+    ('num_keys', np.int32)
+])
+
+knode_params = {
+    'location': {'limits': (0, 10 ** 6), 'unique': True},
+    'keys': {'limits': (0, 100), 'unique': True, 'sorted': True},
+    'order': {'limits': (0, 10), 'permutation': True},
+    'num_keys': (0, 8)
+}
+
+def check_knode(vals):
+    assert len(np.unique(vals['location'])) == len(vals)
+    assert (np.diff(vals['keys'], axis=1) > 0).all()
+    assert ((vals['keys'] >= 0) & (vals['keys'] < 100)).all()
+    order = np.sort(vals['order'].reshape(len(vals), -1), axis=1)
+    assert (order == np.arange(6)).all()
+
+@pytest.mark.parametrize('seed', [None, 10])
+def test_struct_field_modes(seed):
+    vals = NumPyRVG(dtype=knode, seed=seed)(knode_params, 5000)
+    check_knode(vals)
+
+def test_struct_field_modes_workers():
+    rand = NumPyRVG(dtype=knode, seed=11)
+    rand.chunk_size = 1000
+    vals = rand(knode_params, 5000, workers=3)
+    check_knode(vals)
+
+    rand = NumPyRVG(dtype=knode, seed=11)
+    rand.chunk_size = 1000
+    assert (rand(knode_params, 5000, workers=1) == vals).all()
+
+def test_modes_for_all_fields():
+    dtype = np.dtype([('a', np.int16, 4), ('b', np.int16, 4)])
+    vals = NumPyRVG(dtype=dtype, seed=12)((0, 5), 100, permutation=True)
+    for name in 'ab':
+        assert (np.sort(vals[name], axis=1) == np.arange(4)).all()
+
+def test_feistel():
+    for span in [1, 2, 3, 1000, 12345]:
+        vals = feistel(np.random.default_rng(span), span, span)
+        assert (np.sort(vals) == np.arange(span)).all()
+
+def test_floyd_rows():
+    vals = floyd_rows(np.random.default_rng(13), 1000, 5, 7)
+    assert (vals < 7).all()
+    assert (np.diff(np.sort(vals, axis=1), axis=1) > 0).all()
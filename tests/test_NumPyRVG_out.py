@@ -0,0 +1,73 @@
+import pytest
+from rvg import NumPyRVG
+import numpy as np
+
+point = np.dtype([
+    ('x', np.float64),
+    ('y', np.float32),
+    ('c', (np.int16, 2))
+])
+
+record = np.dtype([
+    ('id', np.uint32),
+    ('p', point)
+])
+
+point_params = {
+    'x' : (0, 1),
+    'y' : (-5, 5),
+    'c' : 9
+}
+
+def test_out_scalar_array():
+    rand = NumPyRVG(limits=(-3, 3), seed=1)
+    out = np.empty((10, 4), dtype=np.int32)
+    res = rand(np.int32, out=out)
+    assert res is out
+    assert ((out >= -3) & (out <= 3)).all()
+
+def test_out_same_values():
+    for dtype in [np.float64, np.float32, np.int64, np.uint8]:
+        expected = NumPyRVG(limits=(0, 100), seed=5)(dtype, shape=1000)
+        out = np.empty(1000, dtype=dtype)
+        NumPyRVG(limits=(0, 100), seed=5)(dtype, out=out)
+        assert (out == expected).all()
+
+def test_out_struct_field_view():
+    records = np.zeros(100, dtype=record)
+    rand = NumPyRVG(dtype=point, seed=2)
+    rand(point_params, out=records['p'])
+
+    assert (records['id'] == 0).all()
+    assert ((records['p']['x'] >= 0) & (records['p']['x'] <= 1)).all()
+    assert ((records['p']['y'] >= -5) & (records['p']['y'] <= 5)).all()
+    assert ((records['p']['c'] >= -9) & (records['p']['c'] <= 9)).all()
+
+def test_out_strided_view():
+    arr = np.zeros((20, 20))
+    rand = NumPyRVG(limits=(1, 2), seed=3)
+    rand(np.float64, out=arr[::2, ::3])
+    assert ((arr[::2, ::3] >= 1) & (arr[::2, ::3] <= 2)).all()
+    assert (arr[1::2] == 0).all()
+
+def test_out_memmap(tmp_path):
+    mm = np.lib.format.open_memmap(str(tmp_path / 'points.npy'), mode='w+', dtype=point, shape=(50,))
+    rand = NumPyRVG(dtype=point, seed=4)
+    rand(point_params, 50, out=mm, workers=2)
+    mm.flush()
+    assert (np.load(str(tmp_path / 'points.npy')) == mm).all()
+
+def test_out_subarray_dtype():
+    rand = NumPyRVG(limit=10, seed=6)
+    out = np.empty((5, 3), dtype=np.int8)
+    rand(np.dtype((np.int8, 3)), shape=5, out=out)
+    assert ((out >= -10) & (out <= 10)).all()
+
+def test_out_errors():
+    rand = NumPyRVG(limit=10)
+    with pytest.raises(TypeError) as e:
+        rand(np.int8, out=np.empty(5, dtype=np.int16))
+    assert str(e.value) == 'argument `out` must be a numpy array of dtype int8'
+    with pytest.raises(ValueError) as e:
+        rand(np.int8, shape=4, out=np.empty(5, dtype=np.int8))
+    assert str(e.value) == 'argument `out` must have shape (4,)'
@@ -0,0 +1,52 @@
+from rvg import NumPyRVG
+import numpy as np
+import pytest
+
+knode = np.dtype([('num_keys', np.int32), ('keys', np.int32, 3), ('is_leaf', np.bool_)])
+knode_params = {'num_keys': (0, 3), 'keys': 10, 'is_leaf': {'p': 0.5}}
+
+def test_pool_scalars():
+    randsmall = NumPyRVG(limit=10, seed=1, pool=100)
+    for t in [np.int8, np.uint16, np.float32, np.double]:
+        vals = [randsmall(t) for _ in range(250)]
+        assert all(isinstance(val, t) for val in vals)
+        assert all(-10 <= val <= 10 for val in vals)
+    assert len(randsmall._pools) == 4
+
+def test_pool_same_values():
+    pooled = NumPyRVG(limit=10, seed=2, pool=100)
+    vals = [pooled(np.uint8) for _ in range(300)]
+    rand = NumPyRVG(limit=10, seed=2)
+    assert vals == [val for _ in range(3) for val in rand(np.uint8, 100)]
+
+def test_pool_structs():
+    rand = NumPyRVG(dtype=knode, seed=3, pool=True)
+    vals = [rand(knode_params) for _ in range(100)]
+    assert all(isinstance(val, np.void) and 0 <= val['num_keys'] <= 3 for val in vals)
+    assert len(rand._pools) == 1 and len(rand(knode_params, 10)) == 10
+
+def test_pool_not_pooled():
+    rand = NumPyRVG(limit=10, pool=True)
+    assert rand(np.int8, dist='normal').dtype == np.int8
+    assert rand([('a', np.int8)])['a'] <= 10
+    assert not rand._pools
+    with pytest.raises(TypeError):
+        NumPyRVG(dtype=np.int8, pool=True)()
+    with pytest.raises(ValueError):
+        NumPyRVG(limit=10, pool=0)
+
+def test_pool_refills():
+    rand = NumPyRVG(limit=10, seed=4, pool=100)
+    calls = []
+    random = rand.random
+    rand.random = lambda *args, **kwargs: calls.append(args[2]) or random(*args, **kwargs)
+    for _ in range(1000):
+        rand(np.uint8)
+    # 1000 scalars take 10 draws of 100 values each, instead of 1000 draws
+    assert calls == [100] * 10
+
+def test_pool_limits_changed():
+    rand = NumPyRVG(limit=10, seed=5, pool=100)
+    assert -10 <= rand(np.int8) <= 10
+    rand.a, rand.b = 100, 110
+    assert all(100 <= rand(np.int8) < 110 for _ in range(50))
@@ -0,0 +1,71 @@
+from rvg import NumPyRVG
+import numpy as np
+import os
+import subprocess as sp
+
+record = np.dtype([
+    ('id', np.uint32),
+    ('node', [('pos', np.float32, 3), ('keys', np.int16, 4)], 2),
+    ('name', 'S6')
+])
+
+record_params = {
+    'id': (0, 1000000),
+    'node': {'pos': 100, 'keys': {'limits': (0, 100), 'unique': True}},
+    'name': {'length': (1, 6)}
+}
+
+class SmallChunks(NumPyRVG):
+    chunk_size = 1000
+
+def threads_result(shape):
+    return SmallChunks(dtype=record, seed=42)(record_params, shape, workers=2)
+
+def test_processes():
+    vals = SmallChunks(dtype=record, seed=42)(record_params, 10500, workers=3, processes=True)
+    assert isinstance(vals, np.memmap)
+    assert (vals == threads_result(10500)).all()
+
+def test_processes_independence():
+    results = [
+        SmallChunks(dtype=record, seed=42)(record_params, 10500, workers=workers, processes=True)
+        for workers in [2, 5]
+    ]
+    assert (results[0] == results[1]).all()
+
+def test_processes_memmap_out(tmp_path):
+    path = str(tmp_path / 'out.npy')
+    out = np.lib.format.open_memmap(path, mode='w+', dtype=record, shape=(10500,))
+    SmallChunks(dtype=record, seed=42)(record_params, out=out[500:], workers=4, processes=True)
+    out.flush()
+    assert (np.load(path)[500:] == threads_result(10000)).all()
+
+def test_processes_array_out():
+    out = np.zeros((10, 300), dtype=record)
+    vals = SmallChunks(dtype=record, seed=42)(record_params, out=out, workers=4, processes=True)
+    assert vals is out
+    assert (out == threads_result((10, 300))).all()
+
+def test_processes_no_leftover_files():
+    import tempfile
+    before = set(os.listdir(tempfile.gettempdir()))
+    SmallChunks(dtype=record, seed=42)(record_params, 5000, workers=2, processes=True)
+    assert not [name for name in set(os.listdir(tempfile.gettempdir())) - before if name.startswith('rvg-')]
+
+def test_processes_cli(tmp_path):
+    path = str(tmp_path / 'out.npy')
+    cmd = 'rvg --numpy int32 --limits -5 5 --workers 3 --processes --samples 200000 --output ' + path
+    cmdout = sp.run(cmd.split(), stdout=sp.PIPE, stderr=sp.PIPE)
+    assert not cmdout.stderr
+    vals = np.load(path)
+    assert vals.shape == (200000,) and ((vals >= -5) & (vals <= 5)).all()
+
+def test_processes_pool_reused():
+    with SmallChunks(dtype=record, seed=42) as rand:
+        vals = rand(record_params, 5000, workers=2, processes=True)
+        executor = rand._process_pool(2)
+        assert (rand(record_params, 5000, workers=2, processes=True) != vals).any()
+        assert rand._process_pool(2) is executor
+        rand(record_params, 5000, workers=3, processes=True)
+        assert rand._process_pool(3) is not executor
+    assert rand._executor is None
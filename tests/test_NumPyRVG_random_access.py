@@ -0,0 +1,76 @@
+from rvg import NumPyRVG
+import numpy as np
+import pytest
+
+knode = np.dtype([
+    ('location', np.int32),
+    ('indices', np.int32, 3),
+    ('keys', [('x', np.int16), ('y', np.float64)], (2, 2)),
+    ('is_leaf', np.bool_),
+    ('num_keys', np.int32)
+])
+
+knode_params = {
+    'location': 1000,
+    'indices': {'limits': (0, 10), 'unique': True},
+    'keys': {'x': (0, np.arange(1, 10001)[:, np.newaxis, np.newaxis]), 'y': (0, 1)},
+    'is_leaf': {'p': 0.3},
+    'num_keys': {'dist': 'poisson', 'lam': 3, 'limits': (0, 10)}
+}
+
+n = 10000
+
+@pytest.fixture
+def rand():
+    rand = NumPyRVG(dtype=knode)
+    rand.block_size = 1000
+    return rand
+
+def test_random_access_slices(rand):
+    full = rand(knode_params, n, seed=1)
+    assert full.shape == (n,)
+    assert ((full['keys']['x'] >= 0) & (full['keys']['x'] < np.arange(1, n + 1)[:, np.newaxis, np.newaxis])).all()
+    for start, stop in [(0, 1), (999, 1001), (2500, 7500), (9999, n), (4000, 4000), (3000, 5000)]:
+        part = rand(knode_params, n, seed=1, start=start, stop=stop)
+        assert part.shape == (stop - start,) and (part == full[start:stop]).all()
+    assert (rand(knode_params, n, seed=1, start=n - 10) == full[-10:]).all()
+
+def test_random_access_independent_of_state(rand):
+    full = rand(knode_params, n, seed=2)
+    rand(knode_params, n)
+    other = NumPyRVG(dtype=knode, seed=3)
+    other.block_size = 1000
+    assert (other(knode_params, n, seed=2) == full).all()
+    assert (rand(knode_params, n, seed=3) != full).any()
+
+def test_random_access_workers(rand):
+    full = rand(knode_params, n, seed=4)
+    assert (rand(knode_params, n, seed=4, workers=4) == full).all()
+    assert (rand(knode_params, n, seed=4, start=1500, stop=8500, workers=3) == full[1500:8500]).all()
+
+def test_random_access_out(rand):
+    out = np.empty(500, dtype=knode)
+    assert rand(knode_params, n, seed=5, start=100, stop=600, out=out) is out
+    assert (out == rand(knode_params, n, seed=5)[100:600]).all()
+
+def test_random_access_multidimensional():
+    rand = NumPyRVG(limits=(0, 100))
+    rand.block_size = 7
+    full = rand(np.int64, (50, 3), seed=6)
+    assert (rand(np.int64, (50, 3), seed=6, start=10, stop=30) == full[10:30]).all()
+
+def test_random_access_errors(rand):
+    with pytest.raises(ValueError):
+        rand(knode_params, start=0, stop=10, seed=1)
+    with pytest.raises(ValueError):
+        rand(knode_params, n, start=0, stop=10)
+    with pytest.raises(ValueError):
+        rand(knode_params, n, seed=1, start=10, stop=5)
+    with pytest.raises(ValueError):
+        rand(knode_params, n, seed=1, stop=n + 1)
+    with pytest.raises(ValueError):
+        rand(knode_params, n, seed=1, layout='columnar')
+    with pytest.raises(ValueError):
+        rand(dict(knode_params, location={'limits': 1000, 'unique': True}), n, seed=1)
+    with pytest.raises(ValueError):
+        rand(knode_params, n, seed=1, density=0.5)
@@ -0,0 +1,116 @@
+import pytest
+from rvg import NumPyRVG
+import numpy as np
+
+knode = np.dtype([
+    ('location', int),
+    ('indices', (int, 3)),
+    ('keys', (int, 3)),
+    ('is_leaf', int),
+    ('num_keys', int)
+])
+
+knode_params = {
+    'location'  : (0, 10),
+    'indices'   : 42,
+    'keys'      : 117,
+    'is_leaf'   : (0, 2),
+    'num_keys'  : (0, 256)
+}
+
+bit_generators = ['PCG64', 'PCG64DXSM', 'Philox', 'SFC64', 'MT19937']
+
+def test_seed_reproducibility():
+    for bit_generator in bit_generators:
+        rand1 = NumPyRVG(dtype=knode, seed=42, bit_generator=bit_generator)
+        rand2 = NumPyRVG(dtype=knode, seed=42, bit_generator=bit_generator)
+        assert (rand1(knode_params, 100) == rand2(knode_params, 100)).all()
+
+def test_seed_independent_of_global_state():
+    rand = NumPyRVG(limits=(-100, 100), seed=7)
+    expected = rand(np.float32, shape=10)
+
+    rand = NumPyRVG(limits=(-100, 100), seed=7)
+    np.random.seed(0)
+    np.random.random(1000)
+    assert (rand(np.float32, shape=10) == expected).all()
+
+def test_different_bit_generators():
+    vals = [NumPyRVG(limit=2**30, seed=1, bit_generator=b)(np.int64, shape=100) for b in bit_generators]
+    for i in range(len(vals)):
+        for j in range(i + 1, len(vals)):
+            assert (vals[i] != vals[j]).any()
+
+def test_bit_generator_class():
+    rand1 = NumPyRVG(limit=100, seed=3, bit_generator=np.random.Philox)
+    rand2 = NumPyRVG(limit=100, seed=3, bit_generator='Philox')
+    assert (rand1(np.int16, shape=50) == rand2(np.int16, shape=50)).all()
+
+def test_rng_instance():
+    rand = NumPyRVG(limits=(0, 1000), rng=np.random.default_rng(5))
+    expected = np.random.default_rng(5).integers(0, 1000, 20, np.uint32)
+    assert (rand(np.uint32, shape=20) == expected).all()
+
+def test_rng_errors():
+    with pytest.raises(TypeError):
+        NumPyRVG(limit=10, rng=np.random.default_rng(), seed=1)
+    with pytest.raises(TypeError):
+        NumPyRVG(limit=10, rng=np.random.RandomState(1))
+    with pytest.raises(ValueError) as e:
+        NumPyRVG(limit=10, bit_generator='xxx')
+    assert 'unknown bit generator `xxx`' in str(e.value)
+    with pytest.raises(AttributeError):
+        NumPyRVG(seed=1)
+
+def test_custom_dist_signatures():
+    rand = NumPyRVG(limit=10, seed=0)
+
+    def dist3(dtype, params, shape):
+        return np.full(shape, 3)
+
+    def dist4(dtype, params, shape, type_limits):
+        return np.full(shape, 4)
+
+    def dist5(dtype, params, shape, type_limits, rng=None):
+        return rng.integers(0, 5, shape)
+
+    assert (rand(np.int8, shape=4, dist=dist3) == 3).all()
+    assert (rand(np.int8, shape=4, dist=dist4) == 4).all()
+    assert (rand(np.int8, shape=4, dist=dist5) < 5).all()
+
+def test_native_float_sampling():
+    for dtype in [np.float16, np.float32, np.float64, np.longdouble]:
+        rand = NumPyRVG(limits=(-3, 7), seed=11)
+        vals = rand(dtype, shape=1000)
+        assert vals.dtype == dtype
+        assert ((vals >= -3) & (vals <= 7)).all()
+        assert isinstance(rand(dtype), dtype)
+
+def test_native_float_full_range():
+    for dtype in [np.float16, np.float32]:
+        info = np.finfo(dtype)
+        rand = NumPyRVG(limits=(float(info.min), float(info.max)), seed=12)
+        vals = rand(dtype, shape=1000)
+        assert np.isfinite(vals).all()
+        assert (vals < 0).any() and (vals > 0).any()
+
+def test_native_float32_in_place():
+    rand = NumPyRVG(limits=(10, 20), seed=13)
+    out = np.empty(1000, dtype=np.float32)
+    expected = np.random.default_rng(13).random(1000, dtype=np.float32) * np.float32(10) + np.float32(10)
+    rand(np.float32, out=out)
+    assert (out == expected).all()
+
+def test_scalar_dispatch():
+    for dtype in [np.uint8, np.int64, np.float16, np.float32, np.float64, np.bool_, np.complex64]:
+        rand, other = NumPyRVG(limits=(-3, 7), seed=14), NumPyRVG(limits=(-3, 7), seed=14)
+        vals = [rand(dtype) for _ in range(20)]
+        expected = [other.random(dtype, (-3, 7)) for _ in range(20)]
+        # the values of calls that skip `random` are the ones that it draws
+        assert vals == expected
+        assert [type(val) for val in vals] == [type(val) for val in expected]
+
+    rand = NumPyRVG(limit=10, seed=15)
+    assert rand(np.int8) is not None
+    rand.a, rand.b = 100, 110
+    assert all(100 <= rand(np.int8) < 110 for _ in range(20))
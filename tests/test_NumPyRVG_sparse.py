@@ -0,0 +1,73 @@
+from rvg import NumPyRVG
+import numpy as np
+import pytest
+
+edge = np.dtype([('weight', np.float32), ('kind', np.uint8), ('double_weight', np.float32)])
+edge_params = {'weight': (0.5, 1.), 'kind': (1, 4), 'double_weight': {'derive': 'weight * 2'}}
+
+@pytest.mark.parametrize('seed', [None, 1])
+def test_sparse_indices(seed):
+    indices, values = NumPyRVG(dtype=edge, seed=seed)(edge_params, (200, 300), density=0.05, sparse_format='indices')
+    assert len(indices) == 2 and len(indices[0]) == len(values)
+    assert 0.04 < len(values) / (200 * 300) < 0.06
+    flat = np.ravel_multi_index(indices, (200, 300))
+    assert (np.diff(flat) > 0).all()
+    assert ((values['weight'] >= 0.5) & (values['weight'] <= 1)).all()
+    assert ((values['kind'] >= 1) & (values['kind'] < 4)).all()
+    assert (values['double_weight'] == values['weight'] * 2).all()
+
+def test_sparse_density_limits():
+    rand = NumPyRVG(limits=(1, 10), seed=2)
+    indices, values = rand(np.int32, 100, density=0, sparse_format='indices')
+    assert len(values) == 0
+    indices, values = rand(np.int32, 100, density=1, sparse_format='indices')
+    assert (indices[0] == np.arange(100)).all()
+    indices, values = rand(np.int32, (4, 5, 6), density=0.5, sparse_format='indices')
+    assert len(indices) == 3 and ((values >= 1) & (values < 10)).all()
+
+def test_sparse_array_limits():
+    upper = np.arange(2, 1002)[:, np.newaxis]
+    indices, values = NumPyRVG(dtype=np.int64, seed=3)((0, upper), (1000, 1000), density=0.01, sparse_format='indices')
+    assert (values < upper[indices[0], 0]).all()
+
+def test_sparse_scipy():
+    sp = pytest.importorskip('scipy.sparse')
+    rand = NumPyRVG(limits=(1, 100), seed=4)
+    coo = rand(np.float64, (10**6, 10**6), density=1e-7)
+    assert isinstance(coo, sp.coo_matrix) and coo.shape == (10**6, 10**6)
+    assert 5e4 < coo.nnz < 1.5e5 and (coo.data >= 1).all()
+    csr = rand(np.int16, (50, 40), density=0.2, sparse_format='csr')
+    assert sp.isspmatrix_csr(csr) and csr.dtype == np.int16
+    dense = csr.toarray()
+    assert ((dense == 0) | ((dense >= 1) & (dense < 100))).all()
+
+def test_sparse_errors():
+    rand = NumPyRVG(dtype=edge)
+    with pytest.raises(ValueError):
+        rand(edge_params, (10, 10), density=1.5)
+    with pytest.raises(ValueError):
+        rand(edge_params, (10, 10), density=0.5, sparse_format='dok')
+    with pytest.raises(ValueError):
+        rand(edge_params, (10, 10), density=0.5)
+    with pytest.raises(ValueError):
+        rand(edge_params, density=0.5, sparse_format='indices')
+    with pytest.raises(ValueError):
+        rand(edge_params, (10, 10), density=0.5, sparse_format='indices', unique=True)
+
+@pytest.mark.parametrize('seed', [None, 5])
+def test_sparse_no_stored_zeros(seed):
+    rand = NumPyRVG(limit=3, seed=seed)
+    indices, values = rand(np.uint8, (1000, 1000), density=0.01, sparse_format='indices')
+    assert (values != 0).all() and ((values >= 1) & (values < 3)).all()
+    assert 0.0095 < len(values) / 10**6 < 0.0105
+    dense = np.zeros((1000, 1000), dtype=np.uint8)
+    dense[indices] = values
+    assert all((a == b).all() for a, b in zip(np.nonzero(dense), indices))
+
+    upper = np.tile([2, 10], 500)
+    indices, values = NumPyRVG(dtype=np.int8, seed=seed)((0, upper), (4, 1000), density=0.3, sparse_format='indices')
+    assert (values != 0).all() and (values < upper[indices[1]]).all()
+
+def test_sparse_only_zeros():
+    with pytest.raises(ValueError):
+        NumPyRVG(limits=(0, 1))(np.int32, 100, density=0.5, sparse_format='indices')
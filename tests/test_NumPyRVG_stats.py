@@ -0,0 +1,75 @@
+from rvg import NumPyRVG
+from rvg.numpyrvg.stats import Stats
+import json
+import numpy as np
+
+knode = np.dtype([
+    ('location', np.int32),
+    ('indices', np.int32, 3),
+    ('keys', np.float64, 3),
+    ('is_leaf', np.bool_),
+    ('num_keys', np.int32)
+])
+
+knode_params = {
+    'location': 1000,
+    'indices': {'limits': (0, 10), 'unique': True},
+    'keys': 1.,
+    'is_leaf': {'p': 0.3},
+    'num_keys': {'derive': 'location % 4'}
+}
+
+def test_profile():
+    rand = NumPyRVG(dtype=knode, seed=1)
+    with rand.profile() as stats:
+        vals = rand(knode_params, 1000)
+        rand(knode_params, 500)
+    assert isinstance(stats, Stats) and rand._stats is None
+
+    assert stats.calls == 2 and stats.outputs == 2 and stats.output_bytes == 1500 * knode.itemsize
+    assert list(stats.fields) == ['location', 'indices', 'keys', 'is_leaf']
+    assert stats.fields['location']['values'] == 1500 and stats.fields['location']['calls'] == 2
+    assert stats.fields['keys']['bytes'] == 1500 * 3 * 8
+    assert stats.fields['indices']['allocations'] == 2
+    assert all(record['draws'] >= record['calls'] for record in stats.fields.values())
+    assert set(stats.phases) == {'compile', 'fill', 'derive', 'total'}
+    assert stats.phases['total'] >= stats.phases['fill'] > 0
+    assert (vals['num_keys'] == vals['location'] % 4).all()
+
+    profile = json.loads(stats.to_json())
+    assert profile['totals']['values'] == 1500 * 8 and profile['fields']['is_leaf']['bytes'] == 1500
+
+def test_profile_workers():
+    rand = NumPyRVG(dtype=knode, seed=2)
+    rand.chunk_size = 100
+    stats = Stats()
+    for processes in (False, True):
+        with rand.profile(stats):
+            rand(knode_params, 1000, workers=2, processes=processes)
+    assert stats.calls == 2 and stats.fields['keys']['values'] == 2 * 3000
+    # each chunk draws each field separately
+    assert stats.fields['keys']['calls'] == 2 * 10
+
+def test_profile_constraints_and_columns():
+    rand = NumPyRVG(dtype=knode, seed=3)
+    with rand.profile() as stats:
+        rand(knode_params, 1000, constraints='location > 0')
+        rand(knode_params, 100, layout='columnar')
+    assert 'constraints' in stats.phases
+    assert stats.fields['location']['values'] > 1100
+
+def test_profile_legacy_state():
+    rand = NumPyRVG(limit=10)
+    with rand.profile() as stats:
+        rand(np.int8, 10)
+    assert stats.fields['value'] == dict(stats.fields['value'], calls=1, values=10, draws=1)
+
+def test_profile_full_range_draws():
+    dtype = np.dtype([('a', np.int8), ('b', np.uint16), ('c', np.int32)])
+    params = {'a': 1000, 'b': (0, 1 << 16), 'c': (-2 ** 40, 2 ** 40)}
+    rand = NumPyRVG(dtype=dtype, seed=2)
+    with rand.profile() as stats:
+        vals = rand(params, 100)
+    # full-range fields are drawn from the raw bits of the bit generator, which are counted all the same
+    assert [stats.fields[name]['draws'] for name in 'abc'] == [1, 1, 1]
+    assert (vals == NumPyRVG(dtype=dtype, seed=2)(params, 100)).all()
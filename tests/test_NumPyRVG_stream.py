@@ -0,0 +1,55 @@
+import itertools
+import pytest
+from rvg import NumPyRVG
+import numpy as np
+
+knode = np.dtype([
+    ('location', int),
+    ('indices', (int, 3)),
+    ('keys', (int, 3)),
+    ('is_leaf', int),
+    ('num_keys', int)
+])
+
+knode_params = {
+    'location'  : (0, 10),
+    'indices'   : 42,
+    'keys'      : 117,
+    'is_leaf'   : (0, 2),
+    'num_keys'  : (0, 256)
+}
+
+def test_stream_total():
+    rand = NumPyRVG(dtype=knode, seed=1)
+    chunks = list(rand.stream(knode, knode_params, total=250, chunk=100))
+
+    assert [len(c) for c in chunks] == [100, 100, 50]
+    for c in chunks:
+        assert c.dtype == knode
+        assert ((c['location'] >= 0) & (c['location'] <= 10)).all()
+        assert ((c['keys'] >= -117) & (c['keys'] <= 117)).all()
+
+def test_stream_same_as_random():
+    chunks = NumPyRVG(limits=(0, 1000), seed=2).stream(np.uint32, (0, 1000), total=30, chunk=10)
+    rand = NumPyRVG(limits=(0, 1000), seed=2)
+    expected = np.concatenate([rand(np.uint32, shape=10) for _ in range(3)])
+    assert (np.concatenate(list(chunks)) == expected).all()
+
+def test_stream_forever():
+    rand = NumPyRVG(limit=5, seed=3)
+    chunks = list(itertools.islice(rand.stream(np.dtype((np.int8, 4)), 5, chunk=7), 20))
+    assert len(chunks) == 20
+    assert all(c.shape == (7, 4) for c in chunks)
+
+def test_stream_reuse():
+    rand = NumPyRVG(limit=5, seed=4)
+    chunks = [c for c in rand.stream(np.int16, 5, total=25, chunk=10, reuse=True)]
+    assert chunks[0] is chunks[1]
+    assert len(chunks[2]) == 5
+
+def test_stream_errors():
+    rand = NumPyRVG(limit=5)
+    with pytest.raises(ValueError):
+        next(rand.stream(np.int8, 5, chunk=0))
+    with pytest.raises(ValueError):
+        next(rand.stream(np.int8, 5, total=-1))
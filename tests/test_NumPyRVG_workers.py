@@ -0,0 +1,60 @@
+import pytest
+from rvg import NumPyRVG
+import numpy as np
+
+record = np.dtype([
+    ('id', np.uint32),
+    ('pos', (np.float32, 3)),
+    ('tag', np.int8)
+])
+
+record_params = {
+    'id'  : (0, 1000000),
+    'pos' : 100,
+    'tag' : 5
+}
+
+class SmallChunks(NumPyRVG):
+    chunk_size = 1000
+
+def test_workers_independence():
+    results = []
+    for workers in [1, 2, 3, 8]:
+        rand = SmallChunks(limits=(-50, 50), seed=42)
+        results.append(rand(np.int32, shape=10500, workers=workers))
+    for res in results[1:]:
+        assert (res == results[0]).all()
+
+def test_workers_structured():
+    results = []
+    for workers in [1, 4]:
+        rand = SmallChunks(dtype=record, seed=42)
+        results.append(rand(record_params, shape=(2500, 2), workers=workers))
+    assert results[0].shape == (2500, 2)
+    assert (results[0] == results[1]).all()
+    assert ((results[0]['tag'] >= -5) & (results[0]['tag'] <= 5)).all()
+
+def test_workers_chunks_differ():
+    rand = SmallChunks(limits=(0, 1 << 30), seed=1)
+    vals = rand(np.int64, shape=3000, workers=2)
+    assert (vals[:1000] != vals[1000:2000]).any()
+    assert (vals[1000:2000] != vals[2000:]).any()
+
+def test_workers_global_state():
+    rand = SmallChunks(limit=1000)
+    np.random.seed(3)
+    vals1 = rand(np.int16, shape=5000, workers=1)
+    np.random.seed(3)
+    vals2 = rand(np.int16, shape=5000, workers=4)
+    assert (vals1 == vals2).all()
+
+def test_workers_scalar():
+    rand = NumPyRVG(dtype=record, seed=0)
+    val = rand(record_params, workers=2)
+    assert val.dtype == record
+
+def test_workers_errors():
+    rand = NumPyRVG(limit=10)
+    with pytest.raises(ValueError) as e:
+        rand(np.int8, shape=10, workers=0)
+    assert str(e.value) == 'argument `workers` must be an integer greater than 0'
@@ -1,3 +1,4 @@
+import json
 import subprocess as sp
 import numpy as np
 
@@ -93,3 +94,72 @@ def test_a_b_limits_proper_usage():
     cout, _ = command('rvg --numpy uint32 --limits ' + str(a) + ' ' + str(b))
     for val in map(int, cout.splitlines()):
         assert 0 <= val <= b
+
+def test_workers():
+    samples = np.random.randint(10, 100)
+    cout, cerr = command('rvg --numpy int32 --limits -5 5 --workers 4 --samples ' + str(samples))
+    assert not cerr
+    assert len(cout.splitlines()) == samples
+    for val in map(int, cout.splitlines()):
+        assert -5 <= val <= 5
+
+def test_processes_without_workers():
+    _, cerr = command('rvg --numpy int32 --samples 10 --processes')
+    assert 'argument -P/--processes: requires -w/--workers' in cerr
+
+def test_output_formats(tmp_path):
+    samples = np.random.randint(10, 100)
+    for fmt in ['npy', 'npz', 'raw', 'text']:
+        path = str(tmp_path / ('out.' + fmt))
+        _, cerr = command('rvg --numpy int16 --limits -5 5 -s ' + str(samples) + ' -o ' + path + ' -f ' + fmt)
+        assert not cerr
+        if fmt == 'npy':
+            vals = np.load(path)
+        elif fmt == 'npz':
+            vals = np.load(path)['arr_0']
+        elif fmt == 'raw':
+            vals = np.fromfile(path, dtype=np.int16)
+        else:
+            vals = np.loadtxt(path, dtype=np.int16)
+        assert vals.shape == (samples,)
+        assert ((vals >= -5) & (vals <= 5)).all()
+
+def test_output_format_by_extension(tmp_path):
+    path = str(tmp_path / 'out.npy')
+    _, cerr = command('rvg --numpy float32 -s 10 -o ' + path)
+    assert not cerr
+    assert np.load(path).dtype == np.float32
+
+def test_format_without_output():
+    _, cerr = command('rvg --numpy int8 --format npy')
+    assert 'argument -f/--format: format npy requires -o/--output' in cerr
+
+def test_text_formats():
+    cout, cerr = command('rvg --numpy float64 --limits 0 10 --samples 20 --format csv --precision 2')
+    assert not cerr
+    for val in cout.splitlines():
+        assert len(val.split('.')[1]) == 2
+        assert 0 <= float(val) <= 10
+
+    cout, cerr = command('rvg --numpy int16 --limits -5 5 --samples 20 --format jsonl')
+    assert not cerr
+    assert all(-5 <= int(val) <= 5 for val in cout.splitlines())
+
+def test_seed_and_cache(tmp_path):
+    cout, cerr = command('rvg --numpy int32 --limits 0 1000 --samples 50 --seed 3')
+    assert not cerr
+    assert command('rvg --numpy int32 --limits 0 1000 --samples 50 --seed 3 --workers 2')[0] == cout
+    cache = str(tmp_path / 'cache')
+    for _ in range(2):
+        assert command('rvg --numpy int32 --limits 0 1000 --samples 50 --seed 3 --cache ' + cache)[0] == cout
+    assert len([p for p in (tmp_path / 'cache').iterdir() if p.suffix == '.npy']) == 1
+
+    _, cerr = command('rvg --numpy int32 --cache ' + cache)
+    assert 'requires -S/--seed' in cerr
+
+def test_stats():
+    cout, cerr = command('rvg --numpy i4,f8 --samples 10 --stats')
+    assert len(cout.splitlines()) == 10
+    stats = json.loads(cerr)
+    assert stats['calls'] == 1 and stats['totals']['values'] == 20
+    assert list(stats['fields']) == ['f0', 'f1']
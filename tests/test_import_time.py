@@ -0,0 +1,39 @@
+import subprocess as sp
+import sys
+
+# total time spent importing the modules of rvg itself (i.e. excluding numpy), in us
+import_time_budget = 50000
+
+def run(code, *flags):
+    cmdout = sp.run([sys.executable] + list(flags) + ['-c', code], stdout=sp.PIPE, stderr=sp.PIPE)
+    assert cmdout.returncode == 0, cmdout.stderr.decode()
+    return cmdout.stdout.decode(), cmdout.stderr.decode()
+
+def test_lazy_numpy_import():
+    cout, _ = run('import sys, rvg, rvg.cli; print("numpy" in sys.modules)')
+    assert cout.strip() == 'False'
+
+    cout, _ = run('import sys, rvg; rvg.NumPyRVG; print("numpy" in sys.modules)')
+    assert cout.strip() == 'True'
+
+def test_no_extra_imports():
+    cout, _ = run(
+        'import sys, numpy\n'
+        'before = set(sys.modules)\n'
+        'from rvg import NumPyRVG\n'
+        'import rvg.cli, rvg.output\n'
+        'print(" ".join(sorted(m for m in set(sys.modules) - before if "." not in m)))'
+    )
+    assert cout.split() == ['rvg']
+
+def test_import_time_budget():
+    _, cerr = run('import numpy; from rvg import NumPyRVG; import rvg.cli, rvg.output', '-X', 'importtime')
+    rvg_time = 0
+    for line in cerr.splitlines():
+        try:
+            self_time, _, name = line.split(':', 1)[1].split('|')
+        except ValueError:
+            continue
+        if name.strip().split('.')[0] == 'rvg':
+            rvg_time += int(self_time)
+    assert 0 < rvg_time < import_time_budget
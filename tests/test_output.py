@@ -0,0 +1,85 @@
+import pytest
+from rvg import NumPyRVG
+import json
+from rvg.output import format_text, guess_format, write_output
+import numpy as np
+
+knode = np.dtype([
+    ('location', int),
+    ('indices', (int, 3)),
+    ('keys', (int, 3)),
+    ('is_leaf', int),
+    ('num_keys', int)
+])
+
+knode_params = {
+    'location'  : (0, 10),
+    'indices'   : 42,
+    'keys'      : 117,
+    'is_leaf'   : (0, 2),
+    'num_keys'  : (0, 256)
+}
+
+def fill_knodes(seed):
+    rand = NumPyRVG(dtype=knode, seed=seed)
+    return lambda out: rand(knode_params, out=out)
+
+def test_guess_format():
+    assert guess_format('a.npy') == 'npy'
+    assert guess_format('a.NPZ') == 'npz'
+    assert guess_format('a.txt') == 'text'
+    assert guess_format('a.bin') == 'raw'
+
+def test_structured_outputs(tmp_path):
+    expected = np.empty(1000, dtype=knode)
+    write_output(str(tmp_path / 'a.npy'), 'npy', knode, 1000, fill_knodes(1), chunk=64)
+    fill = fill_knodes(1)
+    for start in range(0, 1000, 64):
+        fill(expected[start:start + 64])
+
+    assert (np.load(str(tmp_path / 'a.npy')) == expected).all()
+
+    write_output(str(tmp_path / 'a.npz'), 'npz', knode, 1000, fill_knodes(1), chunk=64)
+    assert (np.load(str(tmp_path / 'a.npz'))['arr_0'] == expected).all()
+
+    write_output(str(tmp_path / 'a.bin'), 'raw', knode, 1000, fill_knodes(1), chunk=64)
+    assert (np.fromfile(str(tmp_path / 'a.bin'), dtype=knode) == expected).all()
+
+    write_output(str(tmp_path / 'a.txt'), 'text', knode, 1000, fill_knodes(1), chunk=64)
+    with open(str(tmp_path / 'a.txt')) as f:
+        assert f.read().splitlines() == [str(val) for val in expected]
+
+def test_single_value_outputs(tmp_path):
+    write_output(str(tmp_path / 'a.npy'), 'npy', np.dtype((np.int8, 4)), None, lambda out: out.fill(3))
+    assert (np.load(str(tmp_path / 'a.npy')) == [3, 3, 3, 3]).all()
+
+    write_output(str(tmp_path / 'a.txt'), 'text', np.int8, None, lambda out: out.fill(3))
+    with open(str(tmp_path / 'a.txt')) as f:
+        assert f.read() == '3\n'
+
+def test_unknown_format(tmp_path):
+    with pytest.raises(ValueError):
+        write_output(str(tmp_path / 'a.out'), 'xxx', np.int8, 10, lambda out: None)
+
+def test_format_text_identical_to_print():
+    for dtype in [np.int8, np.uint64, np.float16, np.float32, np.float64, np.longdouble]:
+        vals = NumPyRVG(limits=(-1000, 1000), seed=1)(dtype, shape=1000)
+        assert format_text(vals) == ''.join(str(val) + '\n' for val in vals)
+
+def test_format_text_csv():
+    vals = np.array([(1, [2.5, 3.25], True)], dtype=[('a', np.int8), ('b', np.float32, 2), ('c', np.bool_)])
+    assert format_text(vals, 'csv') == '1,2.5,3.25,True\n'
+    assert format_text(vals, 'csv', delimiter='\t', precision=1) == '1\t2.5\t3.2\tTrue\n'
+
+def test_format_text_precision():
+    vals = np.array([0.5, 1 / 3], dtype=np.float64)
+    assert format_text(vals, precision=3) == '0.500\n0.333\n'
+
+def test_format_text_jsonl():
+    vals = NumPyRVG(dtype=knode, seed=2)(knode_params, shape=10)
+    lines = format_text(vals, 'jsonl').splitlines()
+    assert len(lines) == 10
+    for line, val in zip(lines, vals):
+        record = json.loads(line)
+        assert record['location'] == val['location']
+        assert record['keys'] == val['keys'].tolist()